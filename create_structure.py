@@ -2,11 +2,15 @@
 Script para crear la estructura completa del proyecto
 """
 
-import os
 from pathlib import Path
 
-def create_project_structure():
-    """Crea toda la estructura de carpetas y archivos base"""
+def create_project_structure(verbose: bool = False):
+    """
+    Crea toda la estructura de carpetas y archivos base
+    
+    Args:
+        verbose: Mostrar cada carpeta y archivo creado
+    """
     
     # Definir estructura
     structure = {
@@ -25,47 +29,48 @@ def create_project_structure():
         'tests': []
     }
     
-    def create_folders(base_path, struct):
-        """Función recursiva para crear carpetas"""
-        for folder, subfolders in struct.items():
-            folder_path = base_path / folder
-            folder_path.mkdir(exist_ok=True)
-            print(f"✅ Creada: {folder_path}")
-            
-            # Crear __init__.py en carpetas de Python
-            if folder in ['src', 'data', 'analysis', 'visualization', 'utils', 'tests']:
-                init_file = folder_path / '__init__.py'
-                if not init_file.exists():
-                    init_file.touch()
-                    print(f"   📄 Creado: __init__.py")
-            
-            # Crear .gitkeep en carpetas de datos
-            if folder in ['raw', 'processed', 'cache', 'images']:
-                gitkeep = folder_path / '.gitkeep'
-                if not gitkeep.exists():
-                    gitkeep.touch()
-                    print(f"   📄 Creado: .gitkeep")
-            
-            # Recursión para subcarpetas
-            if isinstance(subfolders, dict):
-                create_folders(folder_path, subfolders)
-            elif isinstance(subfolders, list):
-                for subfolder in subfolders:
-                    subfolder_path = folder_path / subfolder
-                    subfolder_path.mkdir(exist_ok=True)
-                    print(f"✅ Creada: {subfolder_path}")
-                    
-                    # __init__.py para subcarpetas de Python
-                    if folder == 'src' or folder_path.parent.name == 'src':
-                        init_file = subfolder_path / '__init__.py'
-                        if not init_file.exists():
-                            init_file.touch()
-                            print(f"   📄 Creado: __init__.py")
+    python_folders = {'src', 'data', 'analysis', 'visualization', 'utils', 'tests'}
+    
+    def iter_folders(struct):
+        """Recorre la estructura sin recursión: (ruta relativa, es_hoja)"""
+        stack = [(Path(), struct)]
+        while stack:
+            parent, children = stack.pop()
+            if isinstance(children, dict):
+                items = children.items()
+            else:
+                items = ((name, None) for name in children)
+            for name, subfolders in items:
+                path = parent / name
+                yield path, not subfolders
+                if subfolders:
+                    stack.append((path, subfolders))
+    
+    def log(message):
+        if verbose:
+            print(message)
     
     # Crear estructura
     base_path = Path.cwd()
     print(f"\n🚀 Creando estructura en: {base_path}\n")
-    create_folders(base_path, structure)
+    
+    folders = {}
+    for path, is_leaf in iter_folders(structure):
+        folders[base_path / path] = is_leaf
+    
+    # Un mkdir por hoja: las carpetas intermedias se crean con parents=True
+    for folder_path in sorted(path for path, is_leaf in folders.items() if is_leaf):
+        folder_path.mkdir(parents=True, exist_ok=True)
+    
+    for folder_path in sorted(folders):
+        log(f"✅ Creada: {folder_path}")
+        
+        # Crear __init__.py en carpetas de Python
+        if folder_path.name in python_folders:
+            init_file = folder_path / '__init__.py'
+            if not init_file.exists():
+                init_file.touch()
+                log(f"   📄 Creado: __init__.py")
     
     # Crear archivos raíz
     root_files = {
@@ -75,13 +80,12 @@ def create_project_structure():
         'MANUAL_USO.md': '# Manual de Uso\n\nDocumentación completa del proyecto.'
     }
     
-    print(f"\n📄 Creando archivos raíz...\n")
+    log(f"\n📄 Creando archivos raíz...\n")
     for filename, content in root_files.items():
         file_path = base_path / filename
         if not file_path.exists():
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            print(f"✅ Creado: {filename}")
+            file_path.write_text(content, encoding='utf-8')
+            log(f"✅ Creado: {filename}")
     
     print(f"\n🎉 ¡Estructura creada exitosamente!\n")
     print("📂 Estructura del proyecto:")
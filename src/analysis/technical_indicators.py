@@ -4,8 +4,150 @@ Módulo para calcular indicadores técnicos
 
 import pandas as pd
 import numpy as np
-from typing import List, Optional
+from typing import Dict, List, Optional
 from ..utils.config import INDICATORS_CONFIG
+from ..utils.rolling import rolling_mean, rolling_means, rolling_mean_std
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, boundscheck=False)
+    def _ema(x: np.ndarray, span: int) -> np.ndarray:
+        """
+        EMA recursiva (equivale a ewm(span, adjust=False).mean())
+        
+        Igual que pandas con ignore_na=False: arranca en el primer valor
+        no NaN y cada NaN posterior repite el último valor, pero su
+        posición sigue contando al ponderar la siguiente observación.
+        """
+        alpha = 2.0 / (span + 1)
+        decay = 1.0 - alpha
+        new_wt = alpha
+        out = np.full(x.size, np.nan)
+        weighted = np.nan
+        old_wt = 1.0
+        for i in range(x.size):
+            cur = x[i]
+            if np.isnan(weighted):
+                weighted = cur
+            else:
+                old_wt *= decay
+                if span == 3:
+                    # pandas usa new_wt = 1 - old_wt cuando com == 1
+                    new_wt = 1.0 - old_wt
+                if not np.isnan(cur):
+                    if weighted != cur:
+                        weighted = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+                    old_wt = 1.0
+            out[i] = weighted
+        return out
+
+    @njit(cache=True)
+    def _rsi(close: np.ndarray, period: int) -> np.ndarray:
+        """RSI con suavizado de Wilder en una sola pasada"""
+        n = close.size
+        out = np.full(n, np.nan)
+
+        # Tickers que empezaron a cotizar más tarde: se salta el tramo
+        # inicial de NaN antes de sembrar las medias
+        start = 0
+        while start < n and np.isnan(close[start]):
+            start += 1
+        if n - start <= period:
+            return out
+
+        # Semilla: media simple de las primeras `period` variaciones
+        avg_gain = 0.0
+        avg_loss = 0.0
+        for i in range(start + 1, start + period + 1):
+            delta = close[i] - close[i - 1]
+            if delta > 0:
+                avg_gain += delta
+            elif delta < 0:
+                avg_loss -= delta
+        avg_gain /= period
+        avg_loss /= period
+
+        for i in range(start + period, n):
+            if i > start + period:
+                delta = close[i] - close[i - 1]
+                gain = delta if delta > 0 else 0.0
+                loss = -delta if delta < 0 else 0.0
+                avg_gain = (avg_gain * (period - 1) + gain) / period
+                avg_loss = (avg_loss * (period - 1) + loss) / period
+
+            if avg_loss > 0:
+                out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+            elif avg_gain > 0:
+                out[i] = 100.0
+        return out
+
+    @njit(cache=True, parallel=True)
+    def _ema_2d(x: np.ndarray, span: int) -> np.ndarray:
+        """EMA de cada columna (un ticker por columna) en paralelo"""
+        out = np.empty(x.shape, dtype=np.float64)
+        for j in prange(x.shape[1]):
+            out[:, j] = _ema(x[:, j], span)
+        return out
+
+    @njit(cache=True, parallel=True)
+    def _rsi_2d(close: np.ndarray, period: int) -> np.ndarray:
+        """RSI de cada columna (un ticker por columna) en paralelo"""
+        out = np.empty(close.shape, dtype=np.float64)
+        for j in prange(close.shape[1]):
+            out[:, j] = _rsi(close[:, j], period)
+        return out
+
+    # Compila (o carga de la caché en disco) el kernel EMA al importar,
+    # para no pagar la compilación en la primera petición
+    _ema(np.zeros(2), 2)
+else:
+    def _ema(x: np.ndarray, span: int) -> np.ndarray:
+        """EMA recursiva (equivale a ewm(span, adjust=False).mean())"""
+        return pd.Series(x).ewm(span=span, adjust=False).mean().to_numpy()
+
+    def _rsi(close: np.ndarray, period: int) -> np.ndarray:
+        """RSI con suavizado de Wilder en una sola pasada"""
+        out = np.full(close.size, np.nan)
+
+        # Tickers que empezaron a cotizar más tarde: se salta el tramo
+        # inicial de NaN antes de sembrar las medias
+        valid = np.flatnonzero(~np.isnan(close))
+        start = valid[0] if valid.size else close.size
+        if close.size - start <= period:
+            return out
+        close = close[start:]
+
+        delta = np.diff(close, prepend=np.nan)
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+
+        # Semilla: media simple de las primeras `period` variaciones; el
+        # resto es una EMA con alpha = 1/period (suavizado de Wilder)
+        gain[period] = gain[1:period + 1].mean()
+        loss[period] = loss[1:period + 1].mean()
+        avg_gain = pd.Series(gain[period:]).ewm(alpha=1 / period, adjust=False).mean()
+        avg_loss = pd.Series(loss[period:]).ewm(alpha=1 / period, adjust=False).mean()
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[start + period:] = 100 - 100 / (1 + avg_gain.to_numpy() / avg_loss.to_numpy())
+        return out
+
+    def _ema_2d(x: np.ndarray, span: int) -> np.ndarray:
+        """EMA de cada columna (un ticker por columna)"""
+        return pd.DataFrame(x).ewm(span=span, adjust=False).mean().to_numpy()
+
+    def _rsi_2d(close: np.ndarray, period: int) -> np.ndarray:
+        """RSI de cada columna (un ticker por columna)"""
+        out = np.empty(close.shape, dtype=np.float64)
+        for j in range(close.shape[1]):
+            out[:, j] = _rsi(close[:, j], period)
+        return out
 
 
 class TechnicalAnalysis:
@@ -13,30 +155,143 @@ class TechnicalAnalysis:
     Clase para calcular indicadores técnicos
     """
     
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, copy: bool = True):
         """
         Args:
             df: DataFrame con datos OHLCV
+            copy: Copiar df; usar False si el llamador no volverá a usarlo
         """
-        self.df = df.copy()
+        self.df = df.copy() if copy else df
     
-    def add_sma(self, periods: List[int] = None) -> pd.DataFrame:
+    def _assign(self, columns: Dict[str, np.ndarray]) -> pd.DataFrame:
         """
-        Añade Simple Moving Averages
+        Añade varias columnas al DataFrame en una sola operación
         
         Args:
-            periods: Lista de períodos para SMA
+            columns: Diccionario {nombre: valores}
         
         Returns:
-            DataFrame con columnas SMA
+            DataFrame con las columnas añadidas
         """
+        self.df = self.df.assign(**columns)
+        return self.df
+    
+    def _close(self) -> np.ndarray:
+        """Precios de cierre como array float64"""
+        return self.df['Close'].to_numpy(dtype=np.float64)
+    
+    def _sma_columns(self, periods: List[int] = None) -> Dict[str, np.ndarray]:
+        """Calcula las columnas SMA_{period}"""
         if periods is None:
             periods = INDICATORS_CONFIG["sma"]["periods"]
         
-        for period in periods:
-            self.df[f'SMA_{period}'] = self.df['Close'].rolling(window=period).mean()
+        # Una sola suma acumulada de Close para todos los períodos
+        means = rolling_means(self._close(), periods)
         
-        return self.df
+        return {f'SMA_{period}': means[period] for period in periods}
+    
+    def _ema_columns(self, periods: List[int] = None) -> Dict[str, np.ndarray]:
+        """Calcula las columnas EMA_{period}"""
+        if periods is None:
+            periods = INDICATORS_CONFIG["ema"]["periods"]
+        
+        # Mismo array contiguo para todos los períodos
+        close = self._close()
+        
+        return {f'EMA_{period}': _ema(close, period) for period in periods}
+    
+    def _rsi_columns(self, period: int = None) -> Dict[str, np.ndarray]:
+        """Calcula la columna RSI"""
+        if period is None:
+            period = INDICATORS_CONFIG["rsi"]["period"]
+        
+        return {'RSI': _rsi(self._close(), period)}
+    
+    def _macd_columns(
+        self,
+        fast: int = None,
+        slow: int = None,
+        signal: int = None
+    ) -> Dict[str, np.ndarray]:
+        """Calcula las columnas MACD, MACD_Signal y MACD_Hist"""
+        if fast is None:
+            fast = INDICATORS_CONFIG["macd"]["fast"]
+        if slow is None:
+            slow = INDICATORS_CONFIG["macd"]["slow"]
+        if signal is None:
+            signal = INDICATORS_CONFIG["macd"]["signal"]
+        
+        close = self._close()
+        
+        macd = _ema(close, fast) - _ema(close, slow)
+        macd_signal = _ema(macd, signal)
+        
+        return {
+            'MACD': macd,
+            'MACD_Signal': macd_signal,
+            'MACD_Hist': macd - macd_signal
+        }
+    
+    def _bollinger_columns(
+        self,
+        period: int = None,
+        std_dev: int = None,
+        computed: Dict[str, np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Calcula las columnas BB_Middle, BB_Upper y BB_Lower
+        
+        Args:
+            period: Período para la media móvil
+            std_dev: Número de desviaciones estándar
+            computed: Columnas ya calculadas aún no añadidas al DataFrame
+        """
+        if period is None:
+            period = INDICATORS_CONFIG["bollinger_bands"]["period"]
+        if std_dev is None:
+            std_dev = INDICATORS_CONFIG["bollinger_bands"]["std_dev"]
+        
+        middle, std = rolling_mean_std(self._close(), period)
+        
+        # Reutiliza la SMA del mismo período si ya fue calculada
+        sma_column = f'SMA_{period}'
+        if computed is not None and sma_column in computed:
+            middle = computed[sma_column]
+        elif sma_column in self.df.columns:
+            middle = self.df[sma_column].to_numpy()
+        
+        return {
+            'BB_Middle': middle,
+            'BB_Upper': middle + (std * std_dev),
+            'BB_Lower': middle - (std * std_dev)
+        }
+    
+    def _volume_columns(self) -> Dict[str, np.ndarray]:
+        """Calcula las columnas Volume_SMA_20 y OBV"""
+        volume = self.df['Volume'].to_numpy(dtype=np.float64)
+        
+        # On-Balance Volume (OBV): suma acumulada del volumen con el signo
+        # de la variación del cierre
+        close = self.df['Close'].to_numpy()
+        direction = np.sign(np.diff(close, prepend=close[:1]))
+        
+        return {
+            # Volumen promedio (media móvil por sumas acumuladas, O(n))
+            'Volume_SMA_20': rolling_mean(volume, 20),
+            'OBV': np.cumsum(direction * volume)
+        }
+    
+    def add_sma(self, periods: List[int] = None) -> pd.DataFrame:
+        """
+        Añade Simple Moving Averages
+        
+        Args:
+            periods: Lista de períodos para SMA
+        
+        Returns:
+            DataFrame con columnas SMA
+        """
+        return self._assign(self._sma_columns(periods))
     
     def add_ema(self, periods: List[int] = None) -> pd.DataFrame:
         """
@@ -48,17 +303,11 @@ class TechnicalAnalysis:
         Returns:
             DataFrame con columnas EMA
         """
-        if periods is None:
-            periods = INDICATORS_CONFIG["ema"]["periods"]
-        
-        for period in periods:
-            self.df[f'EMA_{period}'] = self.df['Close'].ewm(span=period, adjust=False).mean()
-        
-        return self.df
+        return self._assign(self._ema_columns(periods))
     
     def add_rsi(self, period: int = None) -> pd.DataFrame:
         """
-        Añade Relative Strength Index
+        Añade Relative Strength Index (suavizado de Wilder)
         
         Args:
             period: Período para RSI
@@ -66,17 +315,7 @@ class TechnicalAnalysis:
         Returns:
             DataFrame con columna RSI
         """
-        if period is None:
-            period = INDICATORS_CONFIG["rsi"]["period"]
-        
-        delta = self.df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        
-        rs = gain / loss
-        self.df['RSI'] = 100 - (100 / (1 + rs))
-        
-        return self.df
+        return self._assign(self._rsi_columns(period))
     
     def add_macd(
         self,
@@ -95,21 +334,7 @@ class TechnicalAnalysis:
         Returns:
             DataFrame con columnas MACD
         """
-        if fast is None:
-            fast = INDICATORS_CONFIG["macd"]["fast"]
-        if slow is None:
-            slow = INDICATORS_CONFIG["macd"]["slow"]
-        if signal is None:
-            signal = INDICATORS_CONFIG["macd"]["signal"]
-        
-        ema_fast = self.df['Close'].ewm(span=fast, adjust=False).mean()
-        ema_slow = self.df['Close'].ewm(span=slow, adjust=False).mean()
-        
-        self.df['MACD'] = ema_fast - ema_slow
-        self.df['MACD_Signal'] = self.df['MACD'].ewm(span=signal, adjust=False).mean()
-        self.df['MACD_Hist'] = self.df['MACD'] - self.df['MACD_Signal']
-        
-        return self.df
+        return self._assign(self._macd_columns(fast, slow, signal))
     
     def add_bollinger_bands(
         self,
@@ -126,18 +351,7 @@ class TechnicalAnalysis:
         Returns:
             DataFrame con columnas de Bollinger
         """
-        if period is None:
-            period = INDICATORS_CONFIG["bollinger_bands"]["period"]
-        if std_dev is None:
-            std_dev = INDICATORS_CONFIG["bollinger_bands"]["std_dev"]
-        
-        self.df['BB_Middle'] = self.df['Close'].rolling(window=period).mean()
-        std = self.df['Close'].rolling(window=period).std()
-        
-        self.df['BB_Upper'] = self.df['BB_Middle'] + (std * std_dev)
-        self.df['BB_Lower'] = self.df['BB_Middle'] - (std * std_dev)
-        
-        return self.df
+        return self._assign(self._bollinger_columns(period, std_dev))
     
     def add_volume_indicators(self) -> pd.DataFrame:
         """
@@ -146,38 +360,133 @@ class TechnicalAnalysis:
         Returns:
             DataFrame con indicadores de volumen
         """
-        # Volumen promedio
-        self.df['Volume_SMA_20'] = self.df['Volume'].rolling(window=20).mean()
-        
-        # On-Balance Volume (OBV)
-        obv = [0]
-        for i in range(1, len(self.df)):
-            if self.df['Close'].iloc[i] > self.df['Close'].iloc[i-1]:
-                obv.append(obv[-1] + self.df['Volume'].iloc[i])
-            elif self.df['Close'].iloc[i] < self.df['Close'].iloc[i-1]:
-                obv.append(obv[-1] - self.df['Volume'].iloc[i])
-            else:
-                obv.append(obv[-1])
+        return self._assign(self._volume_columns())
+    
+    def _indicator_columns(self) -> Dict[str, np.ndarray]:
+        """Calcula las columnas de precio (SMA, EMA, RSI, MACD y Bollinger)"""
+        columns = {}
+        columns.update(self._sma_columns())
+        columns.update(self._ema_columns())
+        columns.update(self._rsi_columns())
+        columns.update(self._macd_columns())
+        columns.update(self._bollinger_columns(computed=columns))
+        return columns
+    
+    @staticmethod
+    def _max_window() -> int:
+        """Mayor ventana que usan los indicadores de la configuración"""
+        return max(
+            *INDICATORS_CONFIG["sma"]["periods"],
+            *INDICATORS_CONFIG["ema"]["periods"],
+            INDICATORS_CONFIG["rsi"]["period"] + 1,
+            INDICATORS_CONFIG["macd"]["slow"] + INDICATORS_CONFIG["macd"]["signal"],
+            INDICATORS_CONFIG["bollinger_bands"]["period"]
+        )
+    
+    def _tail_columns(self, tail_rows: int) -> Dict[str, np.ndarray]:
+        """
+        Calcula las columnas de precio solo para las últimas filas
         
-        self.df['OBV'] = obv
+        Se usa un tramo de max_window + tail_rows barras; el resto de
+        filas queda en NaN. Las medias y bandas son exactas; EMA, RSI y
+        MACD parten del inicio del tramo, con una diferencia despreciable
+        tras max_window barras de calentamiento.
         
-        return self.df
+        Args:
+            tail_rows: Número de filas finales a calcular
+        """
+        n = len(self.df)
+        size = min(n, self._max_window() + tail_rows)
+        tail = TechnicalAnalysis(self.df.iloc[n - size:], copy=False)
+        
+        columns = {}
+        for name, values in tail._indicator_columns().items():
+            column = np.full(n, np.nan)
+            column[n - size:][-tail_rows:] = values[-tail_rows:]
+            columns[name] = column
+        return columns
     
-    def add_all_indicators(self) -> pd.DataFrame:
+    def add_all_indicators(self, tail_only: bool = False, tail_rows: int = 5) -> pd.DataFrame:
         """
         Añade todos los indicadores técnicos
         
+        Las columnas se calculan por separado y se añaden al DataFrame
+        en una sola asignación.
+        
+        Args:
+            tail_only: Calcular solo las últimas filas (suficiente para
+                get_signals, no para gráficos)
+            tail_rows: Filas finales a calcular cuando tail_only=True
+        
         Returns:
             DataFrame con todos los indicadores
         """
-        self.add_sma()
-        self.add_ema()
-        self.add_rsi()
-        self.add_macd()
-        self.add_bollinger_bands()
-        self.add_volume_indicators()
+        if tail_only and len(self.df) > 0:
+            columns = self._tail_columns(max(1, min(tail_rows, len(self.df))))
+        else:
+            columns = self._indicator_columns()
+        columns.update(self._volume_columns())
         
-        return self.df
+        return self._assign(columns)
+    
+    @staticmethod
+    def batch(
+        closes: np.ndarray,
+        volumes: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Calcula los indicadores de muchos tickers a la vez
+        
+        Cada columna es un ticker alineado por fecha: las medias y
+        desviaciones salen de sumas acumuladas sobre el eje 0 y las
+        recurrencias (EMA, RSI) recorren los tickers en paralelo.
+        
+        Args:
+            closes: Precios de cierre, forma (n_barras, n_tickers)
+            volumes: Volúmenes con la misma forma (opcional)
+        
+        Returns:
+            Diccionario {indicador: array (n_barras, n_tickers)}
+        """
+        closes = np.asarray(closes, dtype=np.float64)
+        
+        sma_periods = INDICATORS_CONFIG["sma"]["periods"]
+        columns = {
+            f'SMA_{period}': mean
+            for period, mean in rolling_means(closes, sma_periods).items()
+        }
+        
+        for period in INDICATORS_CONFIG["ema"]["periods"]:
+            columns[f'EMA_{period}'] = _ema_2d(closes, period)
+        
+        columns['RSI'] = _rsi_2d(closes, INDICATORS_CONFIG["rsi"]["period"])
+        
+        macd_config = INDICATORS_CONFIG["macd"]
+        macd = _ema_2d(closes, macd_config["fast"]) - _ema_2d(closes, macd_config["slow"])
+        macd_signal = _ema_2d(macd, macd_config["signal"])
+        columns['MACD'] = macd
+        columns['MACD_Signal'] = macd_signal
+        columns['MACD_Hist'] = macd - macd_signal
+        
+        bb_period = INDICATORS_CONFIG["bollinger_bands"]["period"]
+        bb_std_dev = INDICATORS_CONFIG["bollinger_bands"]["std_dev"]
+        middle, std = rolling_mean_std(closes, bb_period)
+        middle = columns.get(f'SMA_{bb_period}', middle)
+        columns['BB_Middle'] = middle
+        columns['BB_Upper'] = middle + (std * bb_std_dev)
+        columns['BB_Lower'] = middle - (std * bb_std_dev)
+        
+        if volumes is not None:
+            volumes = np.asarray(volumes, dtype=np.float64)
+            direction = np.sign(np.diff(closes, axis=0, prepend=closes[:1]))
+            columns['Volume_SMA_20'] = rolling_mean(volumes, 20)
+            # El primer cierre válido de cada ticker cuenta como variación
+            # nula, igual que por ticker; las filas previas quedan en NaN
+            obv = np.nancumsum(direction * volumes, axis=0)
+            obv[np.isnan(closes)] = np.nan
+            columns['OBV'] = obv
+        
+        return columns
     
     def get_signals(self) -> dict:
         """
@@ -187,10 +496,15 @@ class TechnicalAnalysis:
             Diccionario con señales
         """
         signals = {}
+        if self.df.empty:
+            return signals
+        
+        # Última fila como diccionario: una sola búsqueda para todos los indicadores
+        last = self.df.iloc[-1].to_dict()
         
         # Señal RSI
-        if 'RSI' in self.df.columns:
-            last_rsi = self.df['RSI'].iloc[-1]
+        if 'RSI' in last:
+            last_rsi = last['RSI']
             if pd.notna(last_rsi):
                 if last_rsi < 30:
                     signals['RSI'] = '🟢 SOBREVENDIDO - Señal de COMPRA'
@@ -202,9 +516,9 @@ class TechnicalAnalysis:
                 signals['RSI'] = '⚪ Sin datos suficientes'
         
         # Señal MACD
-        if 'MACD' in self.df.columns and 'MACD_Signal' in self.df.columns:
-            last_macd = self.df['MACD'].iloc[-1]
-            last_signal = self.df['MACD_Signal'].iloc[-1]
+        if 'MACD' in last and 'MACD_Signal' in last:
+            last_macd = last['MACD']
+            last_signal = last['MACD_Signal']
             if pd.notna(last_macd) and pd.notna(last_signal):
                 if last_macd > last_signal:
                     signals['MACD'] = '🟢 ALCISTA - Señal de COMPRA'
@@ -214,10 +528,10 @@ class TechnicalAnalysis:
                 signals['MACD'] = '⚪ Sin datos suficientes'
         
         # Señal Moving Averages
-        if 'SMA_50' in self.df.columns and 'SMA_200' in self.df.columns:
-            last_close = self.df['Close'].iloc[-1]
-            last_sma_50 = self.df['SMA_50'].iloc[-1]
-            last_sma_200 = self.df['SMA_200'].iloc[-1]
+        if 'SMA_50' in last and 'SMA_200' in last:
+            last_close = last.get('Close')
+            last_sma_50 = last['SMA_50']
+            last_sma_200 = last['SMA_200']
             
             if pd.notna(last_sma_50) and pd.notna(last_sma_200):
                 if last_close > last_sma_50 and last_sma_50 > last_sma_200:
@@ -229,4 +543,4 @@ class TechnicalAnalysis:
             else:
                 signals['MA_Trend'] = '⚪ Sin datos suficientes'
         
-        return signals
\ No newline at end of file
+        return signals
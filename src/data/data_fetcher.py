@@ -4,9 +4,172 @@ Módulo para obtener datos de acciones usando yfinance
 
 import yfinance as yf
 import pandas as pd
+import aiohttp
+import asyncio
+import io
+import json
+import random
+import requests
 import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Dict, List, Optional
 import streamlit as st
+from yfinance.exceptions import YFRateLimitError
+from ..utils.config import (
+    CACHE_CONFIG,
+    CACHE_DIR,
+    HTTP_HEADERS,
+    SP500_CONSTITUENTS_URL,
+    YAHOO_CHART_URL,
+    get_session
+)
+
+
+def _chart_to_dataframe(payload: dict, interval: str) -> Optional[pd.DataFrame]:
+    """
+    Convierte la respuesta JSON del endpoint chart de Yahoo en un DataFrame
+    
+    Los precios se ajustan por dividendos y splits, igual que
+    Ticker.history(auto_adjust=True).
+    
+    Args:
+        payload: JSON devuelto por /v8/finance/chart
+        interval: Intervalo solicitado
+    
+    Returns:
+        DataFrame OHLCV o None si la respuesta no tiene datos
+    """
+    result = payload['chart']['result'][0]
+    timestamps = result.get('timestamp')
+    if not timestamps:
+        return None
+    
+    quote = result['indicators']['quote'][0]
+    timezone = result['meta'].get('exchangeTimezoneName', 'UTC')
+    index = pd.to_datetime(timestamps, unit='s', utc=True).tz_convert(timezone)
+    if not interval.endswith(('m', 'h')):
+        index = index.normalize()
+    
+    df = pd.DataFrame(
+        {
+            'Open': quote['open'],
+            'High': quote['high'],
+            'Low': quote['low'],
+            'Close': quote['close'],
+            'Volume': quote['volume']
+        },
+        index=pd.DatetimeIndex(index, name='Date'),
+        dtype='float64'
+    )
+    
+    adjclose = result['indicators'].get('adjclose')
+    if adjclose:
+        ratio = pd.Series(adjclose[0]['adjclose'], index=df.index, dtype='float64') / df['Close']
+        df[['Open', 'High', 'Low', 'Close']] = df[['Open', 'High', 'Low', 'Close']].mul(ratio, axis=0)
+    
+    return df.dropna(how='all')
+
+
+def _compact_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduce los precios OHLC a float32 y el volumen a int64
+    
+    La precisión de float32 sobra para precios de acciones y reduce a la
+    mitad la memoria de cada DataFrame (y el tamaño del cache).
+    
+    Args:
+        df: DataFrame OHLCV
+    
+    Returns:
+        DataFrame con tipos reducidos
+    """
+    dtypes = {
+        column: 'float32'
+        for column in ('Open', 'High', 'Low', 'Close')
+        if column in df.columns
+    }
+    if 'Volume' in df.columns and not df['Volume'].isna().any():
+        dtypes['Volume'] = 'int64'
+    return df.astype(dtypes)
+
+
+async def _fetch_chart(
+    session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    ticker: str,
+    period: str,
+    interval: str,
+    max_retries: int,
+    retry_delay: float
+):
+    """
+    Descarga el histórico de un ticker desde el endpoint chart de Yahoo
+    
+    Solo espera (con backoff exponencial y jitter) cuando Yahoo responde 429.
+    
+    Returns:
+        Tupla (ticker, DataFrame o None)
+    """
+    url = YAHOO_CHART_URL.format(ticker=ticker)
+    params = {'range': period, 'interval': interval, 'events': 'div,splits'}
+    
+    async with semaphore:
+        for attempt in range(max_retries):
+            try:
+                async with session.get(url, params=params) as response:
+                    if response.status == 429:
+                        await asyncio.sleep(retry_delay * 2 ** attempt + random.uniform(0, retry_delay))
+                        continue
+                    response.raise_for_status()
+                    payload = await response.json()
+                return ticker, _chart_to_dataframe(payload, interval)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, LookupError, TypeError):
+                return ticker, None
+    
+    return ticker, None
+
+
+async def fetch_charts(
+    tickers: List[str],
+    period: str,
+    interval: str = '1d',
+    max_concurrency: int = 8,
+    max_retries: int = 3,
+    retry_delay: float = 0.5
+) -> Dict[str, pd.DataFrame]:
+    """
+    Descarga varios tickers de forma concurrente con aiohttp
+    
+    Pide cada ticker directamente al endpoint chart de Yahoo (sin
+    yfinance), con un semáforo como límite de peticiones simultáneas.
+    
+    Args:
+        tickers: Lista de símbolos
+        period: Período de tiempo
+        interval: Intervalo
+        max_concurrency: Máximo de peticiones simultáneas
+        max_retries: Intentos por ticker ante respuestas 429
+        retry_delay: Espera base del backoff en segundos
+    
+    Returns:
+        Diccionario {ticker: DataFrame} con los tickers que tienen datos
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    timeout = aiohttp.ClientTimeout(total=15)
+    
+    async with aiohttp.ClientSession(headers=HTTP_HEADERS, timeout=timeout) as session:
+        results = await asyncio.gather(*(
+            _fetch_chart(session, semaphore, ticker, period, interval, max_retries, retry_delay)
+            for ticker in dict.fromkeys(tickers)
+        ))
+    
+    return {
+        ticker: df
+        for ticker, df in results
+        if df is not None and not df.empty
+    }
+
 
 class StockDataFetcher:
     """Clase para obtener datos de acciones con manejo robusto de errores"""
@@ -15,6 +178,61 @@ class StockDataFetcher:
         """Inicializa el fetcher"""
         self.max_retries = 5
         self.retry_delay = 2
+        self.cache_dir = CACHE_DIR
+        self.cache_ttl = CACHE_CONFIG['stock_data_ttl']
+        self.info_cache_ttl = CACHE_CONFIG['stock_info_ttl']
+        self.sp500_cache_ttl = CACHE_CONFIG['sp500_list_ttl']
+        
+        # Sesión HTTP del proceso (config.get_session) para las peticiones
+        # directas; yfinance mantiene la suya (curl_cffi), que necesita
+        # para el handshake de cookie/crumb
+        self.session = get_session()
+    
+    def _cache_file(self, ticker: str, period: str, interval: str) -> Path:
+        """Ruta del cache en disco de un ticker"""
+        return self.cache_dir / f"{ticker}_{period}_{interval}.parquet"
+    
+    @staticmethod
+    def _is_fresh(cache_file: Path, ttl: int) -> bool:
+        """Indica si el archivo de cache existe y no ha expirado"""
+        try:
+            return time.time() - cache_file.stat().st_mtime <= ttl
+        except OSError:
+            return False
+    
+    def _load_cache(self, cache_file: Path) -> Optional[pd.DataFrame]:
+        """Lee el cache en disco si existe y no ha expirado"""
+        if not self._is_fresh(cache_file, self.cache_ttl):
+            return None
+        try:
+            return pd.read_parquet(cache_file)
+        except Exception:
+            return None
+    
+    def _save_cache(self, df: pd.DataFrame, cache_file: Path) -> None:
+        """Guarda el DataFrame en el cache en disco (columnar, zstd)"""
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(cache_file, compression='zstd')
+        except Exception:
+            pass
+    
+    def _load_json_cache(self, cache_file: Path, ttl: int):
+        """Lee un cache JSON si existe y no ha expirado"""
+        if not self._is_fresh(cache_file, ttl):
+            return None
+        try:
+            return json.loads(cache_file.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+    
+    def _save_json_cache(self, data, cache_file: Path) -> None:
+        """Guarda un objeto serializable como JSON en el cache en disco"""
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            cache_file.write_text(json.dumps(data), encoding='utf-8')
+        except (OSError, TypeError):
+            pass
     
     def get_stock_data(
         self, 
@@ -33,6 +251,11 @@ class StockDataFetcher:
         Returns:
             DataFrame con datos históricos o None
         """
+        cache_file = self._cache_file(ticker, period, interval)
+        df = self._load_cache(cache_file)
+        if df is not None and not df.empty:
+            return df
+        
         for attempt in range(self.max_retries):
             try:
                 # Delay entre reintentos
@@ -50,13 +273,16 @@ class StockDataFetcher:
                 
                 # Verifica que tenga datos
                 if df is not None and not df.empty and len(df) > 0:
+                    df = _compact_ohlcv(df)
+                    self._save_cache(df, cache_file)
                     return df
                 
                 # Si está vacío, continúa al siguiente intento
                 if attempt < self.max_retries - 1:
                     continue
-                    
-            except Exception as e:
+            
+            # Límite de peticiones (429): único nivel de reintento
+            except YFRateLimitError as e:
                 if attempt == self.max_retries - 1:
                     try:
                         st.error(f"❌ Error al cargar {ticker}: {str(e)}")
@@ -64,6 +290,13 @@ class StockDataFetcher:
                         pass
                     return None
                 continue
+            
+            except Exception as e:
+                try:
+                    st.error(f"❌ Error al cargar {ticker}: {str(e)}")
+                except:
+                    pass
+                return None
         
         try:
             st.warning(f"⚠️ No se pudieron obtener datos para {ticker}")
@@ -78,7 +311,13 @@ class StockDataFetcher:
         interval: str = '1d'
     ) -> Dict[str, pd.DataFrame]:
         """
-        Obtiene datos de múltiples acciones con delays
+        Obtiene datos de múltiples acciones en una sola descarga por lotes
+        
+        Primero se lee el cache en disco de cada ticker; los que falten se
+        piden en una sola llamada a yf.download (yfinance los descarga en
+        paralelo) y se guardan en el cache. Los que no lleguen en el lote se
+        piden de forma concurrente al endpoint de charts, o uno por uno con
+        get_stock_data si ya hay un event loop activo.
         
         Args:
             tickers: Lista de símbolos
@@ -88,56 +327,114 @@ class StockDataFetcher:
         Returns:
             Diccionario {ticker: DataFrame}
         """
+        tickers = list(tickers)
         data_dict = {}
-        total = len(tickers)
         
-        # Progress bar (intenta mostrar, si falla continúa sin progress)
-        try:
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            show_progress = True
-        except:
-            show_progress = False
-        
-        for i, ticker in enumerate(tickers):
-            # Actualiza progreso
-            if show_progress:
-                try:
-                    progress = (i + 1) / total
-                    progress_bar.progress(progress)
-                    status_text.text(f"Cargando {ticker}... ({i+1}/{total})")
-                except:
-                    pass
-            
-            # Delay entre requests
-            if i > 0:
-                time.sleep(1.5)
-            
-            # Descarga datos
-            df = self.get_stock_data(ticker, period, interval)
+        # Cache en disco por ticker (el mismo que usa get_stock_data)
+        for ticker in tickers:
+            df = self._load_cache(self._cache_file(ticker, period, interval))
             if df is not None and not df.empty:
                 data_dict[ticker] = df
         
-        # Limpia UI
-        if show_progress:
+        pending = [ticker for ticker in tickers if ticker not in data_dict]
+        if not pending:
+            return {ticker: data_dict[ticker] for ticker in tickers}
+        
+        try:
+            raw = yf.download(
+                tickers=pending,
+                period=period,
+                interval=interval,
+                group_by='ticker',
+                threads=True,
+                progress=False,
+                auto_adjust=True,
+                actions=False,
+                prepost=False,
+                ignore_tz=False
+            )
+        except Exception:
+            raw = None
+        
+        downloaded = {}
+        if raw is not None and not raw.empty:
+            if isinstance(raw.columns, pd.MultiIndex):
+                available = set(raw.columns.get_level_values(0))
+                for ticker in pending:
+                    if ticker in available:
+                        df = raw[ticker].dropna(how='all')
+                        if not df.empty:
+                            downloaded[ticker] = _compact_ohlcv(df)
+            elif len(pending) == 1:
+                downloaded[pending[0]] = _compact_ohlcv(raw.dropna(how='all'))
+        
+        for ticker, df in downloaded.items():
+            self._save_cache(df, self._cache_file(ticker, period, interval))
+        data_dict.update(downloaded)
+        
+        # Los que faltaron en el lote se piden de forma concurrente
+        missing = [ticker for ticker in tickers if ticker not in data_dict]
+        if missing:
             try:
-                progress_bar.empty()
-                status_text.empty()
-            except:
-                pass
+                asyncio.get_running_loop()
+            except RuntimeError:
+                data_dict.update(asyncio.run(self._fetch_charts(missing, period, interval)))
+            else:
+                # Ya hay un event loop activo: descarga uno por uno
+                for ticker in missing:
+                    df = self.get_stock_data(ticker, period, interval)
+                    if df is not None and not df.empty:
+                        data_dict[ticker] = df
+        
+        return {ticker: data_dict[ticker] for ticker in tickers if ticker in data_dict}
+    
+    async def _fetch_charts(
+        self,
+        tickers: List[str],
+        period: str,
+        interval: str
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Descarga varios tickers con fetch_charts y los guarda en el cache
+        
+        Args:
+            tickers: Lista de símbolos
+            period: Período de tiempo
+            interval: Intervalo
+        
+        Returns:
+            Diccionario {ticker: DataFrame}
+        """
+        # retry_delay de fetch_charts (0.5 s): con el de get_stock_data (2 s)
+        # un ticker con 429 ocuparía un hueco del semáforo casi un minuto
+        charts = await fetch_charts(tickers, period, interval, max_retries=self.max_retries)
+        
+        data_dict = {}
+        for ticker, df in charts.items():
+            df = _compact_ohlcv(df)
+            self._save_cache(df, self._cache_file(ticker, period, interval))
+            data_dict[ticker] = df
         
         return data_dict
     
-    def get_stock_info(self, ticker: str) -> Dict:
+    def _fetch_stock_info(self, ticker: str) -> Optional[Dict]:
         """
-        Obtiene información de la empresa
+        Descarga la información de la empresa sin tocar la interfaz
+        
+        Se puede llamar desde hilos sin ScriptRunContext: los errores se
+        devuelven como None y los notifica quien llama.
         
         Args:
             ticker: Símbolo de la acción
         
         Returns:
-            Diccionario con información de la empresa
+            Diccionario con información de la empresa o None
         """
+        cache_file = self.cache_dir / f"{ticker}_info.json"
+        cached_info = self._load_json_cache(cache_file, self.info_cache_ttl)
+        if cached_info:
+            return cached_info
+        
         for attempt in range(3):
             try:
                 if attempt > 0:
@@ -159,29 +456,106 @@ class StockDataFetcher:
                         'website': info.get('website', ''),
                         'description': info.get('longBusinessSummary', '')
                     }
+                    
+                    self._save_json_cache(standardized_info, cache_file)
+                    
                     return standardized_info
                     
-            except Exception as e:
+            # Límite de peticiones (429): único nivel de reintento
+            except YFRateLimitError:
                 if attempt == 2:
-                    try:
-                        st.warning(f"⚠️ No se pudo obtener información de {ticker}")
-                    except:
-                        pass
-                    return {}
+                    return None
                 continue
+            
+            except Exception:
+                return None
         
-        return {}
+        return None
+    
+    def get_stock_info(self, ticker: str) -> Dict:
+        """
+        Obtiene información de la empresa
+        
+        Args:
+            ticker: Símbolo de la acción
+        
+        Returns:
+            Diccionario con información de la empresa
+        """
+        info = self._fetch_stock_info(ticker)
+        if info is None:
+            try:
+                st.warning(f"⚠️ No se pudo obtener información de {ticker}")
+            except:
+                pass
+            return {}
+        return info
+    
+    def get_multiple_stock_infos(
+        self,
+        tickers: List[str],
+        max_workers: int = 8
+    ) -> Dict[str, Dict]:
+        """
+        Obtiene información de varias empresas en paralelo
+        
+        Las consultas son de red, así que se reparten en un pool de hilos.
+        Los hilos no tienen ScriptRunContext, así que no llaman a st.*: los
+        fallos se notifican una sola vez desde el hilo que llama.
+        
+        Args:
+            tickers: Lista de símbolos
+            max_workers: Número máximo de consultas simultáneas
+        
+        Returns:
+            Diccionario {ticker: información} ({} para los que fallan)
+        """
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tickers))) as executor:
+            infos = dict(zip(tickers, executor.map(self._fetch_stock_info, tickers)))
+        
+        failed = [ticker for ticker, info in infos.items() if info is None]
+        if failed:
+            try:
+                st.warning(f"⚠️ No se pudo obtener información de {', '.join(failed)}")
+            except:
+                pass
+        
+        return {ticker: info or {} for ticker, info in infos.items()}
     
     def get_sp500_tickers(self) -> List[str]:
         """
         Obtiene lista de tickers del S&P 500
         
+        Descarga el CSV de componentes del índice (guardado en cache en
+        disco); si la descarga falla usa una lista de tickers populares.
+        
         Returns:
             Lista de símbolos del S&P 500
         """
+        cache_file = self.cache_dir / 'sp500_tickers.json'
+        cached_tickers = self._load_json_cache(cache_file, self.sp500_cache_ttl)
+        if cached_tickers:
+            return cached_tickers
+        
+        try:
+            response = self.session.get(SP500_CONSTITUENTS_URL, timeout=10)
+            response.raise_for_status()
+            symbols = pd.read_csv(io.StringIO(response.text), usecols=['Symbol'])['Symbol']
+            # Yahoo usa '-' en lugar de '.' (BRK.B -> BRK-B)
+            tickers = sorted(symbols.dropna().str.replace('.', '-', regex=False).unique())
+            if tickers:
+                self._save_json_cache(tickers, cache_file)
+                return tickers
+        except (requests.RequestException, ValueError):
+            pass
+        
         # Lista hardcodeada de tickers populares del S&P 500
         tickers = [
-            'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'META', 'TSLA', 'BRK.B',
+            'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'META', 'TSLA', 'BRK-B',
             'V', 'JNJ', 'WMT', 'JPM', 'MA', 'PG', 'UNH', 'HD', 'DIS', 'BAC',
             'ADBE', 'CRM', 'NFLX', 'CMCSA', 'XOM', 'KO', 'PEP', 'CSCO', 'AVGO',
             'INTC', 'VZ', 'NKE', 'TMO', 'ABT', 'CVX', 'MRK', 'ACN', 'COST', 'DHR',
@@ -193,4 +567,15 @@ class StockDataFetcher:
             'NSC', 'ITW', 'BSX', 'HCA', 'EQIX', 'SHW', 'PNC', 'CME', 'SCHW'
         ]
         
-        return sorted(tickers)
\ No newline at end of file
+        return sorted(tickers)
+
+
+@st.cache_resource
+def get_fetcher() -> StockDataFetcher:
+    """
+    Fetcher único compartido por todas las páginas y sesiones
+    
+    Returns:
+        Instancia de StockDataFetcher
+    """
+    return StockDataFetcher()
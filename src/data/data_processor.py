@@ -5,6 +5,7 @@ Módulo para procesar y limpiar datos
 import pandas as pd
 import numpy as np
 from typing import List
+from ..utils.rolling import rolling_mean_std
 
 
 class DataProcessor:
@@ -28,8 +29,9 @@ class DataProcessor:
         # Eliminar duplicados
         df = df[~df.index.duplicated(keep='first')]
         
-        # Interpolar valores faltantes
-        df = df.interpolate(method='linear', limit_direction='both')
+        # Rellenar valores faltantes con el último valor conocido
+        # (y el primero disponible para los huecos iniciales)
+        df = df.ffill().bfill()
         
         # Eliminar filas con todos los valores NaN
         df = df.dropna(how='all')
@@ -49,8 +51,18 @@ class DataProcessor:
             DataFrame con columna de retornos
         """
         df = df.copy()
-        df['Returns'] = df[column].pct_change()
-        df['Cumulative_Returns'] = (1 + df['Returns']).cumprod() - 1
+        prices = df[column].to_numpy(dtype=np.float64)
+
+        returns = np.full(prices.shape, np.nan)
+        cumulative_returns = np.full(prices.shape, np.nan)
+        if prices.size > 0:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                returns[1:] = np.diff(prices) / prices[:-1]
+                # Directo desde los precios: sin producto acumulado de (1 + r)
+                cumulative_returns = prices / prices[0] - 1
+
+        df['Returns'] = returns
+        df['Cumulative_Returns'] = cumulative_returns
         return df
     
     @staticmethod
@@ -71,7 +83,8 @@ class DataProcessor:
             DataFrame con columna de volatilidad
         """
         df = df.copy()
-        df['Volatility'] = df[column].rolling(window=window).std() * np.sqrt(252)
+        _, std = rolling_mean_std(df[column].to_numpy(), window)
+        df['Volatility'] = std * np.sqrt(252)
         return df
     
     @staticmethod
@@ -18,10 +18,13 @@ print(f'Cantidad: {len(tickers)}')
 print(f'Primeros 10: {tickers[:10]}')
 print(f'Son strings?: {all(isinstance(t, str) for t in tickers[:10])}')
 
+# AAPL y MSFT en una sola descarga por lotes (un único yf.download)
+stocks = fetcher.get_multiple_stocks(['AAPL', 'MSFT'], period='1mo')
+
 # Test 2: Descargar AAPL
 print('\n📈 Test 2: Descargar AAPL')
 print('-' * 50)
-df = fetcher.get_stock_data('AAPL', period='1mo')
+df = stocks.get('AAPL')
 
 if df is not None:
     print('✅ Éxito!')
@@ -36,7 +39,7 @@ else:
 # Test 3: Descargar Microsoft
 print('\n📊 Test 3: Descargar MSFT')
 print('-' * 50)
-df_msft = fetcher.get_stock_data('MSFT', period='1mo')
+df_msft = stocks.get('MSFT')
 
 if df_msft is not None:
     print('✅ Éxito!')
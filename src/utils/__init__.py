@@ -1,15 +1,26 @@
 """
 Utilidades del proyecto
+
+Los nombres se importan bajo demanda (PEP 562): importar la configuración
+no carga yfinance ni el resto de data_fetcher.
 """
 
-from .data_fetcher import get_stock_data, get_multiple_stocks, get_stock_info
-from .config import APP_CONFIG, MAJOR_INDICES, SP500_STOCKS
-
-__all__ = [
-    'get_stock_data',
-    'get_multiple_stocks',
-    'get_stock_info',
-    'APP_CONFIG',
-    'MAJOR_INDICES',
-    'SP500_STOCKS'
-]
\ No newline at end of file
+_EXPORTS = {
+    'get_stock_data': '.data_fetcher',
+    'get_multiple_stocks': '.data_fetcher',
+    'get_stock_info': '.data_fetcher',
+    'APP_CONFIG': '.config',
+    'MAJOR_INDICES': '.config',
+    'SP500_STOCKS': '.config'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        from importlib import import_module
+        value = getattr(import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
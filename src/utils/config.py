@@ -2,7 +2,8 @@
 Configuración de la aplicación
 """
 
-import streamlit as st
+import functools
+from pathlib import Path
 
 # Configuración de la página
 APP_CONFIG = {
@@ -12,19 +13,64 @@ APP_CONFIG = {
     "initial_sidebar_state": "expanded"
 }
 
-# Configuración de yfinance con headers personalizados
-import yfinance as yf
+# Configuración HTTP con headers personalizados
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .rate_limiter import RateLimiter
 
-# Configura sesión con headers personalizados para evitar bloqueos
-session = requests.Session()
-session.headers.update({
+# Headers personalizados para evitar bloqueos
+HTTP_HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
     'Accept-Language': 'en-US,en;q=0.5',
     'Accept-Encoding': 'gzip, deflate',
     'Connection': 'keep-alive',
-})
+}
+
+
+@functools.lru_cache(maxsize=1)
+def get_session() -> requests.Session:
+    """
+    Sesión HTTP compartida con headers personalizados para evitar bloqueos
+    
+    Se crea una sola vez por proceso, de modo que todas las llamadas
+    reutilizan el mismo pool de conexiones. Los errores de conexión y
+    5xx se reintentan en urllib3 con backoff exponencial; los 429 se
+    dejan a los fetchers, que los reintentan una sola vez por nivel.
+    
+    Returns:
+        Sesión de requests
+    """
+    session = requests.Session()
+    session.headers.update(HTTP_HEADERS)
+    # Compresión con todas las codificaciones que urllib3 sabe decodificar
+    # (br/zstd solo si brotli/zstandard están instalados)
+    session.headers.update(urllib3.util.make_headers(accept_encoding=True))
+    
+    # Pool amplio para las descargas concurrentes (el de urllib3 es de 10)
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=64,
+        max_retries=Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=['GET'],
+            raise_on_status=False
+        )
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+# Límite de peticiones a Yahoo Finance: 5 por segundo en promedio
+limiter = RateLimiter(5, 1.0)
+
+# Endpoint de históricos de Yahoo Finance (JSON)
+YAHOO_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
 
 # Índices principales
 MAJOR_INDICES = {
@@ -34,19 +80,8 @@ MAJOR_INDICES = {
     "Russell 2000": "^RUT"
 }
 
-# Lista de acciones populares del S&P 500
-SP500_STOCKS = [
-    "AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA", "BRK.B",
-    "V", "JNJ", "WMT", "JPM", "MA", "PG", "UNH", "HD", "DIS", "BAC",
-    "ADBE", "CRM", "NFLX", "CMCSA", "XOM", "KO", "PEP", "CSCO", "AVGO",
-    "INTC", "VZ", "NKE", "TMO", "ABT", "CVX", "MRK", "ACN", "COST", "DHR",
-    "LLY", "MDT", "ORCL", "TXN", "NEE", "PM", "HON", "UNP", "RTX", "LOW",
-    "QCOM", "BMY", "SBUX", "IBM", "INTU", "AMD", "AMGN", "CAT", "GE",
-    "BA", "MMM", "GS", "BKNG", "BLK", "AXP", "DE", "LMT", "SPGI", "SYK",
-    "GILD", "ADP", "MO", "TGT", "MDLZ", "CI", "CVS", "ISRG", "ZTS", "USB",
-    "PLD", "C", "DUK", "SO", "MMC", "TJX", "BDX", "CB", "EOG", "CL",
-    "NSC", "ITW", "BSX", "HCA", "EQIX", "SHW", "PNC", "CME", "SCHW"
-]
+# CSV con los componentes actuales del S&P 500
+SP500_CONSTITUENTS_URL = "https://datahub.io/core/s-and-p-500-companies/r/constituents.csv"
 
 # Colores para gráficos
 CHART_COLORS = {
@@ -140,13 +175,31 @@ CACHE_CONFIG = {
     'stock_data_ttl': 3600,  # 1 hora
     'market_data_ttl': 1800,  # 30 minutos
     'stock_info_ttl': 7200,   # 2 horas
-    'sp500_list_ttl': 86400   # 24 horas
+    'sp500_list_ttl': 86400,  # 24 horas
+    'max_workers': 8          # Hilos para descargas concurrentes
 }
 
+# Directorios de datos y del cache en disco
+DATA_DIR = Path(__file__).resolve().parents[2] / 'data'
+CACHE_DIR = DATA_DIR / 'cache'
+
+# Lista de acciones populares del S&P 500 (columna 'ticker')
+SP500_STOCKS_FILE = DATA_DIR / 'raw' / 'sp500.parquet'
+
 # Configuración de la aplicación
 APP_SETTINGS = {
     'max_stocks_comparison': 10,
     'default_chart_height': 600,
     'enable_animations': True,
     'theme': 'plotly_white'
-}
\ No newline at end of file
+}
+
+
+def __getattr__(name):
+    # SP500_STOCKS se lee del Parquet en el primer acceso (PEP 562)
+    if name == 'SP500_STOCKS':
+        import pandas as pd
+        stocks = tuple(pd.read_parquet(SP500_STOCKS_FILE, columns=['ticker'])['ticker'])
+        globals()['SP500_STOCKS'] = stocks
+        return stocks
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
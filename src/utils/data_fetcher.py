@@ -4,12 +4,85 @@ Módulo para descargar datos de Yahoo Finance con manejo robusto de errores
 
 import yfinance as yf
 import streamlit as st
+import random
+import threading
 import time
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional
+from yfinance.exceptions import YFException, YFRateLimitError
+from .config import CACHE_CONFIG, limiter
+from ..data.data_fetcher import fetch_charts
+
+
+# Columnas que usan los gráficos e indicadores
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def _ohlcv_only(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Descarta las columnas que no se usan y reduce los tipos numéricos
+    
+    Args:
+        data: DataFrame devuelto por yfinance
+    
+    Returns:
+        DataFrame OHLCV con precios float32 y volumen int64
+    """
+    data = data[[column for column in OHLCV_COLUMNS if column in data.columns]]
+    dtypes = {
+        column: 'float32'
+        for column in ('Open', 'High', 'Low', 'Close')
+        if column in data.columns
+    }
+    if 'Volume' in data.columns and not data['Volume'].isna().any():
+        dtypes['Volume'] = 'int64'
+    return data.astype(dtypes)
+
+
+# Cache en memoria delante de st.cache_data: {(ticker, period, interval): (instante, DataFrame)}
+_mem_cache: Dict[tuple, tuple] = {}
+_mem_cache_lock = threading.Lock()
+MEM_CACHE_SIZE = 256
+MEM_CACHE_TTL = 3600
+
 
-@st.cache_data(ttl=3600, show_spinner="📊 Cargando datos...")
 def get_stock_data(ticker: str, period: str = "1y", interval: str = "1d") -> Optional[pd.DataFrame]:
+    """
+    Descarga datos de una acción (con cache en memoria del proceso)
+    
+    Las consultas repetidas se sirven con una copia del DataFrame guardado,
+    sin pasar por el pickle de st.cache_data; el cache es seguro entre
+    hilos (get_multiple_stocks lo llama desde un ThreadPoolExecutor).
+    
+    Args:
+        ticker: Símbolo de la acción (ej: 'AAPL')
+        period: Período de tiempo
+        interval: Intervalo
+    
+    Returns:
+        DataFrame con datos históricos o None si falla
+    """
+    key = (ticker, period, interval)
+    with _mem_cache_lock:
+        cached = _mem_cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < MEM_CACHE_TTL:
+        return cached[1].copy()
+    
+    data = _get_stock_data_cached(ticker, period, interval)
+    if data is not None:
+        with _mem_cache_lock:
+            _mem_cache.pop(key, None)
+            # Expulsión FIFO: se descarta la entrada más antigua
+            if len(_mem_cache) >= MEM_CACHE_SIZE:
+                _mem_cache.pop(next(iter(_mem_cache)), None)
+            _mem_cache[key] = (time.monotonic(), data)
+        return data.copy()
+    return data
+
+
+@st.cache_data(ttl=3600, show_spinner="📊 Cargando datos...")
+def _get_stock_data_cached(ticker: str, period: str = "1y", interval: str = "1d") -> Optional[pd.DataFrame]:
     """
     Descarga datos de una acción con retry logic
     
@@ -21,17 +94,19 @@ def get_stock_data(ticker: str, period: str = "1y", interval: str = "1d") -> Opt
     Returns:
         DataFrame con datos históricos o None si falla
     """
-    max_retries = 5
-    retry_delay = 2
+    # yfinance usa su propia sesión (la necesita para el handshake de
+    # cookie/crumb); aquí solo se reintentan los 429
+    max_retries = 3
     
     for attempt in range(max_retries):
         try:
-            # Delay progresivo entre reintentos
+            # Backoff exponencial con jitter entre reintentos
             if attempt > 0:
-                wait_time = retry_delay * attempt
+                wait_time = min(30, 0.5 * (2 ** attempt)) + random.uniform(0, 0.5)
                 time.sleep(wait_time)
             
-            # Descarga con timeout
+            # Descarga con timeout, respetando el límite de peticiones
+            limiter.acquire()
             stock = yf.Ticker(ticker)
             data = stock.history(
                 period=period,
@@ -42,26 +117,124 @@ def get_stock_data(ticker: str, period: str = "1y", interval: str = "1d") -> Opt
             
             # Verifica que tenga datos
             if data is not None and not data.empty and len(data) > 0:
-                return data
+                return _ohlcv_only(data)
             
             # Si está vacío pero no es el último intento, continúa
             if attempt < max_retries - 1:
                 continue
-                
-        except Exception as e:
+        
+        # Límite de peticiones (429): se reintenta con backoff
+        except YFRateLimitError as e:
             if attempt == max_retries - 1:
                 st.error(f"❌ Error al cargar {ticker}: {str(e)}")
                 return None
             continue
+        
+        # El resto no mejora reintentando
+        except Exception as e:
+            st.error(f"❌ Error al cargar {ticker}: {str(e)}")
+            return None
     
     st.warning(f"⚠️ No se pudieron obtener datos para {ticker}")
     return None
 
 
-@st.cache_data(ttl=1800, show_spinner="📈 Cargando múltiples acciones...")
+# Máximo de símbolos por llamada a yf.download en listas grandes
+MAX_BATCH_SIZE = 20
+
+# Lotes descargados en paralelo
+MAX_BATCH_WORKERS = 4
+
+
+def _chunks(items: list, size: int = MAX_BATCH_SIZE):
+    """Divide una lista en trozos consecutivos de como máximo `size` elementos"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _download_batch(tickers: list, period: str) -> Dict[str, pd.DataFrame]:
+    """
+    Descarga varios tickers con una sola llamada a yf.download
+    
+    Args:
+        tickers: Lista de símbolos
+        period: Período de tiempo
+    
+    Returns:
+        Diccionario {ticker: DataFrame} solo con los tickers con datos
+    """
+    try:
+        raw = yf.download(
+            tickers=" ".join(tickers),
+            period=period,
+            interval="1d",
+            group_by='ticker',
+            threads=True,
+            progress=False,
+            auto_adjust=True,
+            actions=False,
+            prepost=False
+        )
+    except Exception:
+        return {}
+    
+    if raw is None or raw.empty:
+        return {}
+    
+    # Con group_by='ticker' las columnas son (ticker, campo)
+    if not isinstance(raw.columns, pd.MultiIndex):
+        return {tickers[0]: _ohlcv_only(raw.dropna(how='all'))} if len(tickers) == 1 else {}
+    
+    available = set(raw.columns.get_level_values(0))
+    data_dict = {}
+    for ticker in tickers:
+        if ticker in available:
+            data = raw[ticker].dropna(how='all')
+            if not data.empty:
+                data_dict[ticker] = _ohlcv_only(data)
+    
+    return data_dict
+
+
+@st.cache_data(ttl=1800, show_spinner=False)
+def _get_multiple_stocks_cached(tickers: list, period: str) -> Dict[str, pd.DataFrame]:
+    """
+    Descarga en lote sin elementos de interfaz
+    
+    Streamlit repite los elementos creados dentro de una función cacheada
+    pero no sus actualizaciones posteriores, así que el estado se muestra
+    en get_multiple_stocks, fuera de la caché.
+    
+    Args:
+        tickers: Lista de símbolos sin duplicados
+        period: Período de tiempo
+    
+    Returns:
+        Diccionario {ticker: DataFrame}
+    """
+    data_dict = {}
+    batches = list(_chunks(tickers))
+    with ThreadPoolExecutor(max_workers=min(MAX_BATCH_WORKERS, len(batches))) as executor:
+        for batch_data in executor.map(lambda batch: _download_batch(batch, period), batches):
+            data_dict.update(batch_data)
+    
+    # Reintento individual solo para los tickers que no llegaron en el lote
+    for ticker in tickers:
+        if ticker not in data_dict:
+            data = get_stock_data(ticker, period)
+            if data is not None and not data.empty:
+                data_dict[ticker] = data
+    
+    return {ticker: data_dict[ticker] for ticker in tickers if ticker in data_dict}
+
+
 def get_multiple_stocks(tickers: list, period: str = "1y") -> Dict[str, pd.DataFrame]:
     """
-    Descarga datos de múltiples acciones con delays
+    Descarga datos de múltiples acciones en lote
+    
+    Las listas grandes se descargan en grupos de hasta MAX_BATCH_SIZE
+    símbolos, varios grupos en paralelo; los tickers que falten en el
+    lote se piden por separado.
     
     Args:
         tickers: Lista de símbolos ['AAPL', 'GOOGL', 'MSFT']
@@ -70,39 +243,53 @@ def get_multiple_stocks(tickers: list, period: str = "1y") -> Dict[str, pd.DataF
     Returns:
         Diccionario {ticker: DataFrame}
     """
-    data_dict = {}
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+    
     total = len(tickers)
+    with st.status(f"📈 Descargando {total} acciones...", expanded=False) as status:
+        data_dict = _get_multiple_stocks_cached(tickers, period)
+        
+        missing = [ticker for ticker in tickers if ticker not in data_dict]
+        if missing:
+            st.write(f"Sin datos para {len(missing)} tickers: {', '.join(missing)}")
+            status.update(label=f"⚠️ {len(data_dict)}/{total} acciones listas", state="error")
+        else:
+            status.update(label=f"✅ {total}/{total} acciones listas", state="complete")
     
-    # Progress bar
-    progress_bar = st.progress(0)
-    status_text = st.empty()
+    return data_dict
+
+
+async def get_multiple_stocks_async(
+    tickers: list,
+    period: str = "1y",
+    max_concurrency: int = 16
+) -> Dict[str, pd.DataFrame]:
+    """
+    Descarga múltiples acciones con una sola hebra y aiohttp
     
-    for i, ticker in enumerate(tickers):
-        # Actualiza progreso
-        progress = (i + 1) / total
-        progress_bar.progress(progress)
-        status_text.text(f"Cargando {ticker}... ({i+1}/{total})")
-        
-        # Delay entre requests para evitar rate limiting
-        if i > 0:
-            time.sleep(1.5)
-        
-        # Descarga datos
-        data = get_stock_data(ticker, period)
-        if data is not None and not data.empty:
-            data_dict[ticker] = data
+    Usa fetch_charts (endpoint chart de Yahoo, sin yfinance).
+    Desde Streamlit: asyncio.run(get_multiple_stocks_async(tickers)).
     
-    # Limpia UI
-    progress_bar.empty()
-    status_text.empty()
+    Args:
+        tickers: Lista de símbolos
+        period: Período de tiempo
+        max_concurrency: Máximo de peticiones simultáneas
     
-    return data_dict
+    Returns:
+        Diccionario {ticker: DataFrame}
+    """
+    charts = await fetch_charts(tickers, period, '1d', max_concurrency=max_concurrency)
+    return {ticker: _ohlcv_only(df) for ticker, df in charts.items()}
 
 
-@st.cache_data(ttl=1800)
-def get_stock_info(ticker: str) -> Optional[dict]:
+def _fetch_stock_info(ticker: str) -> Optional[dict]:
     """
-    Obtiene información de la empresa
+    Descarga la información de la empresa sin tocar la interfaz
+    
+    Se puede llamar desde hilos sin ScriptRunContext: los errores se
+    devuelven como None y los notifica quien llama.
     
     Args:
         ticker: Símbolo de la acción
@@ -117,16 +304,66 @@ def get_stock_info(ticker: str) -> Optional[dict]:
             if attempt > 0:
                 time.sleep(2)
             
+            limiter.acquire()
             stock = yf.Ticker(ticker)
             info = stock.info
             
             if info and len(info) > 0:
                 return info
-                
-        except Exception as e:
+        
+        # OSError cubre los errores de red (requests.HTTPError, timeouts)
+        except (OSError, KeyError, ValueError, YFException):
             if attempt == max_retries - 1:
-                st.warning(f"⚠️ No se pudo obtener información de {ticker}")
                 return None
             continue
     
-    return None
\ No newline at end of file
+    return None
+
+
+@st.cache_data(ttl=1800)
+def get_stock_info(ticker: str) -> Optional[dict]:
+    """
+    Obtiene información de la empresa
+    
+    Args:
+        ticker: Símbolo de la acción
+    
+    Returns:
+        Diccionario con info de la empresa o None
+    """
+    info = _fetch_stock_info(ticker)
+    if info is None:
+        st.warning(f"⚠️ No se pudo obtener información de {ticker}")
+    return info
+
+
+@st.cache_data(ttl=7200, show_spinner=False)
+def get_multiple_stock_infos(
+    tickers: list,
+    max_workers: int = CACHE_CONFIG['max_workers']
+) -> Dict[str, Optional[dict]]:
+    """
+    Obtiene la información de varias empresas en paralelo
+    
+    Args:
+        tickers: Lista de símbolos
+        max_workers: Número máximo de hilos
+    
+    Returns:
+        Diccionario {ticker: info o None}
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+    
+    # Las peticiones son de E/S: los hilos esperan en red sin bloquear el GIL.
+    # Los hilos no tienen ScriptRunContext, así que no llaman a st.*: los
+    # fallos se notifican aquí, en el hilo del script
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tickers))) as executor:
+        infos = dict(zip(tickers, executor.map(_fetch_stock_info, tickers)))
+    
+    failed = [ticker for ticker, info in infos.items() if info is None]
+    if failed:
+        st.warning(f"⚠️ No se pudo obtener información de {', '.join(failed)}")
+    
+    return infos
@@ -0,0 +1,45 @@
+"""
+Limitador de peticiones por ventana deslizante
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class RateLimiter:
+    """
+    Permite como máximo `rate` peticiones en cada ventana de `period` segundos
+
+    Las ráfagas cortas pasan sin espera; solo se duerme cuando la ventana
+    ya está llena. Es seguro entre hilos.
+    """
+
+    def __init__(self, rate: int, period: float = 1.0):
+        """
+        Args:
+            rate: Número máximo de peticiones por ventana
+            period: Duración de la ventana en segundos
+        """
+        self.rate = rate
+        self.period = period
+        self._timestamps = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Espera hasta que haya hueco en la ventana y registra la petición"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+
+                # Descarta las peticiones que ya salieron de la ventana
+                while self._timestamps and now - self._timestamps[0] >= self.period:
+                    self._timestamps.popleft()
+
+                if len(self._timestamps) < self.rate:
+                    self._timestamps.append(now)
+                    return
+
+                wait_time = self.period - (now - self._timestamps[0])
+
+            time.sleep(wait_time)
@@ -0,0 +1,131 @@
+"""
+Ventanas móviles vectorizadas con NumPy (sumas acumuladas)
+"""
+
+import numpy as np
+from typing import Dict, Iterable, Optional, Tuple
+
+
+def _prefix_sums(x: np.ndarray) -> np.ndarray:
+    """
+    Suma acumulada a lo largo del eje 0 con una fila inicial de ceros
+
+    Args:
+        x: Array 1-D o 2-D (filas = tiempo)
+
+    Returns:
+        Array float64 con una fila más que x
+    """
+    prefix = np.zeros((x.shape[0] + 1,) + x.shape[1:], dtype=np.float64)
+    np.cumsum(x, axis=0, out=prefix[1:])
+    return prefix
+
+
+def _window_sums(prefix: np.ndarray, window: int) -> np.ndarray:
+    """
+    Sumas de cada ventana a partir de las sumas acumuladas
+
+    Las primeras window-1 filas quedan en NaN, igual que rolling(window)
+    """
+    n = prefix.shape[0] - 1
+    out = np.full((n,) + prefix.shape[1:], np.nan)
+    if 0 < window <= n:
+        out[window - 1:] = prefix[window:] - prefix[:-window]
+    return out
+
+
+def _masked_prefix(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """
+    Prepara x para las sumas acumuladas aislando los NaN
+
+    Returns:
+        (x sin NaN, sumas acumuladas de x, sumas acumuladas de NaN o None)
+    """
+    missing = np.isnan(x)
+    if missing.any():
+        x = np.where(missing, 0.0, x)
+        return x, _prefix_sums(x), _prefix_sums(missing)
+    return x, _prefix_sums(x), None
+
+
+def rolling_means(x, windows: Iterable[int]) -> Dict[int, np.ndarray]:
+    """
+    Medias móviles de varias ventanas con una sola pasada sobre x
+
+    Equivale a rolling(window).mean() para cada ventana: una ventana
+    que contiene algún NaN da NaN.
+
+    Args:
+        x: Array 1-D o 2-D (filas = tiempo)
+        windows: Tamaños de ventana
+
+    Returns:
+        Diccionario {ventana: array de medias}
+    """
+    x = np.asarray(x, dtype=np.float64)
+    _, prefix, missing_prefix = _masked_prefix(x)
+
+    means = {}
+    for window in windows:
+        mean = _window_sums(prefix, window) / window
+        if missing_prefix is not None:
+            mean[_window_sums(missing_prefix, window) > 0] = np.nan
+        means[window] = mean
+
+    return means
+
+
+def rolling_mean(x, window: int) -> np.ndarray:
+    """
+    Media móvil, equivalente a rolling(window).mean()
+
+    Args:
+        x: Array 1-D o 2-D (filas = tiempo)
+        window: Tamaño de la ventana
+
+    Returns:
+        Array de medias
+    """
+    return rolling_means(x, [window])[window]
+
+
+def rolling_mean_std(x, window: int, ddof: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Media y desviación estándar móviles en O(n) con sumas acumuladas
+
+    Usa Var = (Σx² − n·media²) / (n − ddof) sobre los datos centrados en su
+    media global, lo que evita la cancelación numérica de la fórmula directa.
+    Equivale a rolling(window).mean() y rolling(window).std(ddof=ddof).
+
+    Args:
+        x: Array 1-D o 2-D (filas = tiempo)
+        window: Tamaño de la ventana
+        ddof: Grados de libertad restados del divisor
+
+    Returns:
+        Tupla (medias, desviaciones estándar)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    missing = np.isnan(x)
+    valid = x.shape[0] - missing.sum(axis=0)
+
+    offset = np.where(missing, 0.0, x).sum(axis=0) / np.maximum(valid, 1)
+    centered = np.where(missing, 0.0, x - offset)
+
+    sums = _window_sums(_prefix_sums(centered), window)
+    sq_sums = _window_sums(_prefix_sums(centered * centered), window)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        centered_mean = sums / window
+        var = (sq_sums - window * centered_mean * centered_mean) / (window - ddof)
+    std = np.sqrt(np.maximum(var, 0.0))
+    if window <= ddof:
+        std[:] = np.nan
+    mean = centered_mean + offset
+
+    if missing.any():
+        incomplete = _window_sums(_prefix_sums(missing), window) > 0
+        mean[incomplete] = np.nan
+        std[incomplete] = np.nan
+
+    return mean, std
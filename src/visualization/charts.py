@@ -3,10 +3,26 @@ Módulo para crear gráficos interactivos con Plotly
 """
 
 import plotly.graph_objects as go
+import streamlit as st
 from plotly.subplots import make_subplots
+import numpy as np
 import pandas as pd
-from typing import List, Optional
+from functools import cached_property
+from typing import List, Optional, Tuple
 from ..utils.config import CHART_COLORS
+from ..data.data_processor import DataProcessor
+
+
+# Paneles de create_full_analysis: nombre -> (título, método que añade las trazas)
+FULL_ANALYSIS_ADDERS = {
+    'candles': ('Precio', '_add_candles'),
+    'volume': ('Volumen', '_add_volume'),
+    'bb': ('Bandas de Bollinger', '_add_bollinger_bands'),
+    'rsi': ('RSI', '_add_rsi'),
+    'macd': ('MACD', '_add_macd'),
+    'returns': ('Retornos Acumulados (%)', '_add_returns')
+}
+FULL_ANALYSIS_PANELS = ('candles', 'rsi', 'macd', 'bb')
 
 
 class ChartBuilder:
@@ -24,6 +40,16 @@ class ChartBuilder:
         self.ticker = ticker
         self.colors = CHART_COLORS
     
+    @cached_property
+    def _up(self) -> np.ndarray:
+        """Máscara de velas alcistas (Close >= Open), calculada una vez"""
+        return self.df['Close'].to_numpy() >= self.df['Open'].to_numpy()
+    
+    @cached_property
+    def _macd_up(self) -> np.ndarray:
+        """Máscara de histograma MACD no negativo, calculada una vez"""
+        return self.df['MACD_Hist'].to_numpy() >= 0
+    
     def create_candlestick_chart(
         self,
         show_volume: bool = True,
@@ -41,20 +67,113 @@ class ChartBuilder:
         Returns:
             Figura de Plotly
         """
-        # Crear subplots
-        if show_volume:
-            fig = make_subplots(
-                rows=2, cols=1,
-                shared_xaxes=True,
-                vertical_spacing=0.03,
-                row_heights=[0.7, 0.3],
-                subplot_titles=(f'{self.ticker} - Precio', 'Volumen')
-            )
-        else:
-            fig = go.Figure()
+        return _cached_figure(
+            '_build_candlestick_chart', self.df, self.ticker,
+            show_volume=show_volume, show_ma=show_ma, ma_periods=ma_periods
+        )
+    
+    def create_rsi_chart(self) -> go.Figure:
+        """
+        Crea gráfico de RSI
+        
+        Returns:
+            Figura de Plotly
+        """
+        return _cached_figure('_build_rsi_chart', self.df, self.ticker)
+    
+    def create_macd_chart(self) -> go.Figure:
+        """
+        Crea gráfico de MACD
+        
+        Returns:
+            Figura de Plotly
+        """
+        return _cached_figure('_build_macd_chart', self.df, self.ticker)
+    
+    def create_bollinger_bands_chart(self) -> go.Figure:
+        """
+        Crea gráfico con Bandas de Bollinger
+        
+        Returns:
+            Figura de Plotly
+        """
+        return _cached_figure('_build_bollinger_bands_chart', self.df, self.ticker)
+    
+    def create_returns_chart(self) -> go.Figure:
+        """
+        Crea gráfico de retornos acumulados
+        
+        Returns:
+            Figura de Plotly
+        """
+        return _cached_figure('_build_returns_chart', self.df, self.ticker)
+    
+    def create_full_analysis(
+        self,
+        indicators: Tuple[str, ...] = FULL_ANALYSIS_PANELS
+    ) -> go.Figure:
+        """
+        Crea una sola figura con varios paneles y eje X compartido
+        
+        Args:
+            indicators: Paneles en orden ('candles', 'volume', 'bb',
+                'rsi', 'macd', 'returns')
+        
+        Returns:
+            Figura de Plotly
+        """
+        return _cached_figure(
+            '_build_full_analysis', self.df, self.ticker,
+            indicators=tuple(indicators)
+        )
+    
+    @staticmethod
+    def create_comparison_chart(dfs: dict, normalize: bool = True) -> go.Figure:
+        """
+        Crea gráfico de comparación entre múltiples acciones
+        
+        Args:
+            dfs: Diccionario {ticker: DataFrame}
+            normalize: Normalizar precios para comparación
+        
+        Returns:
+            Figura de Plotly
+        """
+        return _cached_figure('_build_comparison_chart', dfs=dfs, normalize=normalize)
+    
+    @staticmethod
+    def create_correlation_heatmap(correlation_matrix: pd.DataFrame) -> go.Figure:
+        """
+        Crea mapa de calor de correlaciones
+        
+        Args:
+            correlation_matrix: Matriz de correlación
+        
+        Returns:
+            Figura de Plotly
+        """
+        return _cached_figure(
+            '_build_correlation_heatmap',
+            correlation_matrix=correlation_matrix
+        )
+    
+    @staticmethod
+    def _cell(row: Optional[int]) -> dict:
+        """Posición de una traza: fila del subplot o figura simple si row es None"""
+        return {} if row is None else {'row': row, 'col': 1}
+    
+    def _add_candles(
+        self,
+        fig: go.Figure,
+        row: Optional[int] = None,
+        show_ma: bool = True,
+        ma_periods: List[int] = [20, 50, 200]
+    ) -> None:
+        """Añade velas japonesas y medias móviles"""
+        cell = self._cell(row)
         
         # Candlestick
-        candlestick = go.Candlestick(
+        fig.add_trace(go.Candlestick(
             x=self.df.index,
             open=self.df['Open'],
             high=self.df['High'],
@@ -63,12 +182,7 @@ class ChartBuilder:
             name='OHLC',
             increasing_line_color=self.colors['success'],
             decreasing_line_color=self.colors['danger']
-        )
-        
-        if show_volume:
-            fig.add_trace(candlestick, row=1, col=1)
-        else:
-            fig.add_trace(candlestick)
+        ), **cell)
         
         # Medias móviles
         if show_ma:
@@ -76,209 +190,223 @@ class ChartBuilder:
             for i, period in enumerate(ma_periods):
                 col_name = f'SMA_{period}'
                 if col_name in self.df.columns:
-                    ma_trace = go.Scatter(
+                    fig.add_trace(go.Scatter(
                         x=self.df.index,
                         y=self.df[col_name],
                         name=f'SMA {period}',
                         line=dict(color=colors_ma[i % len(colors_ma)], width=2)
-                    )
-                    if show_volume:
-                        fig.add_trace(ma_trace, row=1, col=1)
-                    else:
-                        fig.add_trace(ma_trace)
-        
-        # Volumen
-        if show_volume:
-            colors = [self.colors['success'] if self.df['Close'].iloc[i] >= self.df['Open'].iloc[i] 
-                     else self.colors['danger'] for i in range(len(self.df))]
-            
-            volume_trace = go.Bar(
-                x=self.df.index,
-                y=self.df['Volume'],
-                name='Volumen',
-                marker_color=colors,
-                showlegend=False
-            )
-            fig.add_trace(volume_trace, row=2, col=1)
-        
-        # Layout
-        fig.update_layout(
-            title=f'{self.ticker} - Análisis de Precios',
-            xaxis_title='Fecha',
-            yaxis_title='Precio (USD)',
-            template='plotly_white',
-            hovermode='x unified',
-            height=600,
-            showlegend=True,
-            xaxis_rangeslider_visible=False
-        )
-        
-        return fig
+                    ), **cell)
     
-    def create_rsi_chart(self) -> go.Figure:
-        """
-        Crea gráfico de RSI
+    def _add_volume(self, fig: go.Figure, row: Optional[int] = None) -> None:
+        """Añade barras de volumen coloreadas según la vela"""
+        colors = np.where(self._up, self.colors['success'], self.colors['danger'])
         
-        Returns:
-            Figura de Plotly
-        """
-        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            x=self.df.index,
+            y=self.df['Volume'],
+            name='Volumen',
+            marker_color=colors,
+            showlegend=False
+        ), **self._cell(row))
+    
+    def _add_rsi(self, fig: go.Figure, row: Optional[int] = None) -> None:
+        """Añade el RSI con sus líneas de referencia"""
+        cell = self._cell(row)
         
         # RSI
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=self.df.index,
             y=self.df['RSI'],
             name='RSI',
             line=dict(color=self.colors['primary'], width=2)
-        ))
+        ), **cell)
         
         # Líneas de referencia
         fig.add_hline(y=70, line_dash="dash", line_color=self.colors['danger'], 
-                     annotation_text="Sobrecomprado (70)")
+                     annotation_text="Sobrecomprado (70)", **cell)
         fig.add_hline(y=30, line_dash="dash", line_color=self.colors['success'], 
-                     annotation_text="Sobrevendido (30)")
+                     annotation_text="Sobrevendido (30)", **cell)
         fig.add_hline(y=50, line_dash="dot", line_color="gray", 
-                     annotation_text="Neutral (50)")
-        
-        fig.update_layout(
-            title=f'{self.ticker} - RSI (Relative Strength Index)',
-            xaxis_title='Fecha',
-            yaxis_title='RSI',
-            template='plotly_white',
-            hovermode='x unified',
-            height=300,
-            yaxis=dict(range=[0, 100])
-        )
-        
-        return fig
+                     annotation_text="Neutral (50)", **cell)
+        fig.update_yaxes(range=[0, 100], **cell)
     
-    def create_macd_chart(self) -> go.Figure:
-        """
-        Crea gráfico de MACD
-        
-        Returns:
-            Figura de Plotly
-        """
-        fig = go.Figure()
+    def _add_macd(self, fig: go.Figure, row: Optional[int] = None) -> None:
+        """Añade las líneas MACD y Signal y el histograma"""
+        cell = self._cell(row)
         
         # MACD Line
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=self.df.index,
             y=self.df['MACD'],
             name='MACD',
             line=dict(color=self.colors['primary'], width=2)
-        ))
+        ), **cell)
         
         # Signal Line
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=self.df.index,
             y=self.df['MACD_Signal'],
             name='Signal',
             line=dict(color=self.colors['secondary'], width=2)
-        ))
+        ), **cell)
         
         # Histogram
-        colors = [self.colors['success'] if val >= 0 else self.colors['danger'] 
-                 for val in self.df['MACD_Hist']]
+        colors = np.where(self._macd_up, self.colors['success'], self.colors['danger'])
         
         fig.add_trace(go.Bar(
             x=self.df.index,
             y=self.df['MACD_Hist'],
             name='Histogram',
             marker_color=colors
-        ))
-        
-        fig.update_layout(
-            title=f'{self.ticker} - MACD',
-            xaxis_title='Fecha',
-            yaxis_title='MACD',
-            template='plotly_white',
-            hovermode='x unified',
-            height=300
-        )
-        
-        return fig
+        ), **cell)
     
-    def create_bollinger_bands_chart(self) -> go.Figure:
-        """
-        Crea gráfico con Bandas de Bollinger
-        
-        Returns:
-            Figura de Plotly
-        """
-        fig = go.Figure()
+    def _add_bollinger_bands(self, fig: go.Figure, row: Optional[int] = None) -> None:
+        """Añade el precio de cierre con las Bandas de Bollinger"""
+        cell = self._cell(row)
         
         # Precio de cierre
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=self.df.index,
             y=self.df['Close'],
             name='Precio',
             line=dict(color=self.colors['primary'], width=2)
-        ))
+        ), **cell)
         
         # Banda superior
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=self.df.index,
             y=self.df['BB_Upper'],
             name='Banda Superior',
             line=dict(color=self.colors['danger'], width=1, dash='dash')
-        ))
+        ), **cell)
         
         # Banda media
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=self.df.index,
             y=self.df['BB_Middle'],
             name='Banda Media',
             line=dict(color='gray', width=1)
-        ))
+        ), **cell)
         
         # Banda inferior
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=self.df.index,
             y=self.df['BB_Lower'],
             name='Banda Inferior',
             line=dict(color=self.colors['success'], width=1, dash='dash'),
             fill='tonexty',
             fillcolor='rgba(127, 127, 127, 0.1)'
-        ))
+        ), **cell)
+    
+    def _add_returns(self, fig: go.Figure, row: Optional[int] = None) -> None:
+        """Añade los retornos acumulados en porcentaje"""
+        cell = self._cell(row)
+        
+        # Los retornos suelen venir calculados; si no, una pasada NumPy
+        df = self.df
+        if 'Cumulative_Returns' not in df.columns:
+            df = DataProcessor.calculate_returns(df)
+        cumulative_returns = df['Cumulative_Returns']
+        
+        fig.add_trace(go.Scattergl(
+            x=self.df.index,
+            y=cumulative_returns * 100,
+            name='Retorno Acumulado',
+            line=dict(color=self.colors['primary'], width=2),
+            fill='tozeroy',
+            fillcolor='rgba(31, 119, 180, 0.2)'
+        ), **cell)
+        
+        fig.add_hline(y=0, line_dash="dash", line_color="gray", **cell)
+    
+    def _build_candlestick_chart(
+        self,
+        show_volume: bool = True,
+        show_ma: bool = True,
+        ma_periods: List[int] = [20, 50, 200]
+    ) -> go.Figure:
+        """Crea un gráfico de velas japonesas (sin cache)"""
+        # Crear subplots
+        if show_volume:
+            fig = make_subplots(
+                rows=2, cols=1,
+                shared_xaxes=True,
+                vertical_spacing=0.03,
+                row_heights=[0.7, 0.3],
+                subplot_titles=(f'{self.ticker} - Precio', 'Volumen')
+            )
+            self._add_candles(fig, 1, show_ma, ma_periods)
+            self._add_volume(fig, 2)
+        else:
+            fig = go.Figure()
+            self._add_candles(fig, None, show_ma, ma_periods)
         
+        # Layout
         fig.update_layout(
-            title=f'{self.ticker} - Bandas de Bollinger',
+            title=f'{self.ticker} - Análisis de Precios',
             xaxis_title='Fecha',
             yaxis_title='Precio (USD)',
             template='plotly_white',
             hovermode='x unified',
-            height=400
+            height=600,
+            showlegend=True,
+            xaxis_rangeslider_visible=False
         )
         
         return fig
     
-    def create_returns_chart(self) -> go.Figure:
-        """
-        Crea gráfico de retornos acumulados
+    def _build_rsi_chart(self) -> go.Figure:
+        """Crea gráfico de RSI (sin cache)"""
+        fig = go.Figure()
+        self._add_rsi(fig)
         
-        Returns:
-            Figura de Plotly
-        """
+        fig.update_layout(
+            title=f'{self.ticker} - RSI (Relative Strength Index)',
+            xaxis_title='Fecha',
+            yaxis_title='RSI',
+            template='plotly_white',
+            hovermode='x unified',
+            height=300
+        )
+        
+        return fig
+    
+    def _build_macd_chart(self) -> go.Figure:
+        """Crea gráfico de MACD (sin cache)"""
         fig = go.Figure()
+        self._add_macd(fig)
         
-        # Calcular retornos si no existen
-        if 'Cumulative_Returns' not in self.df.columns:
-            returns = self.df['Close'].pct_change()
-            cumulative_returns = (1 + returns).cumprod() - 1
-        else:
-            cumulative_returns = self.df['Cumulative_Returns']
+        fig.update_layout(
+            title=f'{self.ticker} - MACD',
+            xaxis_title='Fecha',
+            yaxis_title='MACD',
+            template='plotly_white',
+            hovermode='x unified',
+            height=300
+        )
         
-        fig.add_trace(go.Scatter(
-            x=self.df.index,
-            y=cumulative_returns * 100,
-            name='Retorno Acumulado',
-            line=dict(color=self.colors['primary'], width=2),
-            fill='tozeroy',
-            fillcolor='rgba(31, 119, 180, 0.2)'
-        ))
+        return fig
+    
+    def _build_bollinger_bands_chart(self) -> go.Figure:
+        """Crea gráfico con Bandas de Bollinger (sin cache)"""
+        fig = go.Figure()
+        self._add_bollinger_bands(fig)
+        
+        fig.update_layout(
+            title=f'{self.ticker} - Bandas de Bollinger',
+            xaxis_title='Fecha',
+            yaxis_title='Precio (USD)',
+            template='plotly_white',
+            hovermode='x unified',
+            height=400
+        )
         
-        fig.add_hline(y=0, line_dash="dash", line_color="gray")
+        return fig
+    
+    def _build_returns_chart(self) -> go.Figure:
+        """Crea gráfico de retornos acumulados (sin cache)"""
+        fig = go.Figure()
+        self._add_returns(fig)
         
         fig.update_layout(
             title=f'{self.ticker} - Retornos Acumulados',
@@ -291,22 +419,45 @@ class ChartBuilder:
         
         return fig
     
-    def create_comparison_chart(self, dfs: dict, normalize: bool = True) -> go.Figure:
-        """
-        Crea gráfico de comparación entre múltiples acciones
+    def _build_full_analysis(
+        self,
+        indicators: Tuple[str, ...] = FULL_ANALYSIS_PANELS
+    ) -> go.Figure:
+        """Crea la figura con todos los paneles en subplots (sin cache)"""
+        panels = [FULL_ANALYSIS_ADDERS[name] for name in indicators]
+        
+        # El panel de precios ocupa el triple de alto que los indicadores
+        weights = [3 if name == 'candles' else 1 for name in indicators]
+        fig = make_subplots(
+            rows=len(panels), cols=1,
+            shared_xaxes=True,
+            vertical_spacing=0.02,
+            row_heights=[weight / sum(weights) for weight in weights],
+            subplot_titles=[title for title, _ in panels]
+        )
         
-        Args:
-            dfs: Diccionario {ticker: DataFrame}
-            normalize: Normalizar precios para comparación
+        for row, (_, adder) in enumerate(panels, start=1):
+            getattr(self, adder)(fig, row)
         
-        Returns:
-            Figura de Plotly
-        """
+        fig.update_xaxes(rangeslider_visible=False)
+        fig.update_layout(
+            title=f'{self.ticker} - Análisis Completo',
+            template='plotly_white',
+            hovermode='x unified',
+            height=200 * sum(weights) + 100,
+            showlegend=True
+        )
+        
+        return fig
+    
+    @staticmethod
+    def _build_comparison_chart(dfs: dict, normalize: bool = True) -> go.Figure:
+        """Crea gráfico de comparación entre múltiples acciones (sin cache)"""
         fig = go.Figure()
         
-        colors = [self.colors['primary'], self.colors['secondary'], 
-                 self.colors['success'], self.colors['danger'], 
-                 self.colors['warning'], self.colors['info']]
+        colors = [CHART_COLORS['primary'], CHART_COLORS['secondary'], 
+                 CHART_COLORS['success'], CHART_COLORS['danger'], 
+                 CHART_COLORS['warning'], CHART_COLORS['info']]
         
         for i, (ticker, df) in enumerate(dfs.items()):
             if normalize:
@@ -317,7 +468,7 @@ class ChartBuilder:
                 y_data = df['Close']
                 y_label = 'Precio (USD)'
             
-            fig.add_trace(go.Scatter(
+            fig.add_trace(go.Scattergl(
                 x=df.index,
                 y=y_data,
                 name=ticker,
@@ -336,23 +487,19 @@ class ChartBuilder:
         
         return fig
     
-    def create_correlation_heatmap(self, correlation_matrix: pd.DataFrame) -> go.Figure:
-        """
-        Crea mapa de calor de correlaciones
+    @staticmethod
+    def _build_correlation_heatmap(correlation_matrix: pd.DataFrame) -> go.Figure:
+        """Crea mapa de calor de correlaciones (sin cache)"""
+        values = correlation_matrix.to_numpy()
         
-        Args:
-            correlation_matrix: Matriz de correlación
-        
-        Returns:
-            Figura de Plotly
-        """
         fig = go.Figure(data=go.Heatmap(
-            z=correlation_matrix.values,
+            z=values,
             x=correlation_matrix.columns,
             y=correlation_matrix.index,
             colorscale='RdBu',
             zmid=0,
-            text=correlation_matrix.values.round(2),
+            # Etiquetas ya formateadas: el navegador solo las inserta
+            text=np.char.mod('%.2f', values),
             texttemplate='%{text}',
             textfont={"size": 10},
             colorbar=dict(title="Correlación")
@@ -365,4 +512,50 @@ class ChartBuilder:
             width=600
         )
         
-        return fig
\ No newline at end of file
+        return fig
+
+
+def _df_fingerprint(df: pd.DataFrame) -> tuple:
+    """
+    Huella de un DataFrame para la clave del cache de figuras
+    
+    Forma y columnas más un hash vectorizado de índice y valores: evita
+    que Streamlit serialice el DataFrame entero y detecta cambios en
+    cualquier fila, no solo en los extremos.
+    """
+    return (
+        df.shape,
+        tuple(df.columns),
+        int(pd.util.hash_pandas_object(df, index=True).sum())
+    )
+
+
+@st.cache_data(
+    ttl=1800,
+    show_spinner=False,
+    hash_funcs={pd.DataFrame: _df_fingerprint}
+)
+def _cached_figure(
+    method: str,
+    df: Optional[pd.DataFrame] = None,
+    ticker: Optional[str] = None,
+    **options
+) -> go.Figure:
+    """
+    Construye una figura de ChartBuilder y la guarda en cache
+    
+    Los reruns de Streamlit con los mismos datos y opciones reutilizan
+    la figura en lugar de reconstruirla.
+    
+    Args:
+        method: Nombre del método _build_* de ChartBuilder
+        df: DataFrame con datos e indicadores (None para los métodos
+            estáticos, que no usan datos de instancia)
+        ticker: Nombre/símbolo de la acción
+        **options: Argumentos del método
+    
+    Returns:
+        Figura de Plotly
+    """
+    builder = ChartBuilder if df is None else ChartBuilder(df, ticker)
+    return getattr(builder, method)(**options)
@@ -17,7 +17,7 @@ from src.utils.data_fetcher import get_stock_data, get_multiple_stocks
 st.set_page_config(**APP_CONFIG)
 
 # CSS personalizado
-st.markdown("""
+_CSS = """
     <style>
     .main {
         padding: 0rem 1rem;
@@ -38,7 +38,16 @@ st.markdown("""
         margin: 0.5rem 0;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+# Pie de página
+_FOOTER_HTML = """
+    <div style='text-align: center; color: gray; padding: 1rem;'>
+        📊 S&P 500 Stock Analyzer | Desarrollado con ❤️ usando Streamlit
+    </div>
+    """
+
+st.markdown(_CSS, unsafe_allow_html=True)
 
 def main():
     """Función principal de la aplicación"""
@@ -130,11 +139,7 @@ def main():
     
     # Footer
     st.markdown("---")
-    st.markdown("""
-    <div style='text-align: center; color: gray; padding: 1rem;'>
-        📊 S&P 500 Stock Analyzer | Desarrollado con ❤️ usando Streamlit
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_FOOTER_HTML, unsafe_allow_html=True)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -5,21 +5,19 @@ Página de Dashboard - Vista general del mercado
 import streamlit as st
 import sys
 from pathlib import Path
-import pandas as pd
 
 # Añadir el directorio raíz al path
 root_dir = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(root_dir))
 
-from src.data.data_fetcher import StockDataFetcher
-from src.visualization.charts import ChartBuilder
+from src.data.data_fetcher import get_fetcher
 
 st.set_page_config(page_title="Dashboard", page_icon="📊", layout="wide")
 
 @st.cache_data(ttl=3600)
 def load_market_overview():
     """Carga vista general del mercado"""
-    fetcher = StockDataFetcher()
+    fetcher = get_fetcher()
     
     # Principales índices
     indices = {
@@ -29,13 +27,14 @@ def load_market_overview():
         '^RUT': 'Russell 2000'
     }
     
-    data = {}
-    for symbol, name in indices.items():
-        df = fetcher.get_stock_data(symbol, period='1mo')
-        if df is not None and not df.empty:
-            data[name] = df
+    # Una sola descarga en lote para todos los índices
+    stock_data = fetcher.get_multiple_stocks(list(indices), period='1mo')
     
-    return data
+    return {
+        name: stock_data[symbol]
+        for symbol, name in indices.items()
+        if symbol in stock_data
+    }
 
 def display_index_card(name, df):
     """Muestra tarjeta con información del índice"""
@@ -83,6 +82,9 @@ def main():
     # Gráfico principal
     st.subheader("📈 S&P 500 - Último Mes")
     
+    # Import diferido: plotly solo se carga al pintar los gráficos
+    from src.visualization.charts import ChartBuilder
+    
     if 'S&P 500' in market_data:
         sp500_df = market_data['S&P 500']
         chart_builder = ChartBuilder(sp500_df, "S&P 500")
@@ -107,8 +109,7 @@ def main():
     st.markdown("---")
     st.subheader("🔄 Comparación de Índices (Normalizado)")
     
-    chart_builder = ChartBuilder(pd.DataFrame(), "Índices")
-    comparison_fig = chart_builder.create_comparison_chart(market_data, normalize=True)
+    comparison_fig = ChartBuilder.create_comparison_chart(market_data, normalize=True)
     st.plotly_chart(comparison_fig, use_container_width=True)
     
     # Información adicional
@@ -10,45 +10,66 @@ from pathlib import Path
 root_dir = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(root_dir))
 
-from src.data.data_fetcher import StockDataFetcher
+from src.data.data_fetcher import get_fetcher
+from src.utils.config import CACHE_CONFIG
 from src.data.data_processor import DataProcessor
 from src.analysis.technical_indicators import TechnicalAnalysis
-from src.visualization.charts import ChartBuilder
 
 st.set_page_config(page_title="Análisis de Acciones", page_icon="🔍", layout="wide")
 
-@st.cache_data(ttl=3600)
+# L1 en memoria; el fetcher guarda además la lista en disco (L2) con el mismo TTL
+@st.cache_data(ttl=CACHE_CONFIG['sp500_list_ttl'])
 def get_sp500_tickers():
     """Obtiene lista de tickers del S&P 500"""
-    fetcher = StockDataFetcher()
+    fetcher = get_fetcher()
     return fetcher.get_sp500_tickers()
 
+@st.cache_data(ttl=CACHE_CONFIG['sp500_list_ttl'])
+def get_sp500_index():
+    """Lista de tickers del S&P 500 y su mapa {ticker: posición}"""
+    tickers = get_sp500_tickers()
+    return tickers, {ticker: i for i, ticker in enumerate(tickers)}
+
+# Columnas de precios que se guardan en el cache (sin dividendos ni splits)
+OHLCV_SCHEMA = ['Open', 'High', 'Low', 'Close', 'Volume', 'Returns', 'Cumulative_Returns']
+
 @st.cache_data(ttl=3600)
 def load_stock_data(ticker, period, interval):
-    """Carga datos de una acción"""
-    fetcher = StockDataFetcher()
+    """
+    Carga datos de una acción con sus indicadores técnicos
+    
+    El cache se indexa por (ticker, period, interval) y guarda solo las
+    columnas de OHLCV_SCHEMA más los indicadores.
+    """
+    fetcher = get_fetcher()
     df = fetcher.get_stock_data(ticker, period, interval)
     
-    if df is not None and not df.empty:
-        # Procesar datos
-        processor = DataProcessor()
-        df = processor.clean_data(df)
-        df = processor.calculate_returns(df)
-        
-        # Añadir indicadores técnicos
-        ta = TechnicalAnalysis(df)
-        df = ta.add_all_indicators()
-        
-        # Obtener señales
-        signals = ta.get_signals()
-        
-        return df, signals
+    if df is None or df.empty:
+        return None, None
+    
+    # Procesar datos
+    processor = DataProcessor()
+    df = processor.clean_data(df)
+    df = processor.calculate_returns(df)
+    df = df[[column for column in OHLCV_SCHEMA if column in df.columns]]
+    
+    # Añadir indicadores técnicos
+    ta = TechnicalAnalysis(df, copy=False)
+    df = ta.add_all_indicators()
     
-    return None, None
+    # Obtener señales
+    signals = ta.get_signals()
+    
+    return df, signals
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _csv_bytes(ticker, columns, df):
+    """CSV de las columnas elegidas, generado una vez por selección"""
+    return df[list(columns)].to_csv().encode('utf-8')
 
 def display_stock_info(ticker):
     """Muestra información de la acción"""
-    fetcher = StockDataFetcher()
+    fetcher = get_fetcher()
     info = fetcher.get_stock_info(ticker)
     
     col1, col2, col3, col4 = st.columns(4)
@@ -93,13 +114,13 @@ def main():
         st.header("⚙️ Configuración")
         
         # Obtener tickers
-        tickers = get_sp500_tickers()
+        tickers, ticker_index = get_sp500_index()
         
         # Selección de acción
         selected_ticker = st.selectbox(
             "Selecciona una acción",
             options=tickers,
-            index=tickers.index('AAPL') if 'AAPL' in tickers else 0
+            index=ticker_index.get('AAPL', 0)
         )
         
         # Período de tiempo
@@ -171,6 +192,8 @@ def main():
         # Gráficos
         st.markdown("---")
         
+        # Import diferido: plotly solo se carga cuando hay algo que dibujar
+        from src.visualization.charts import ChartBuilder
         chart_builder = ChartBuilder(df, selected_ticker)
         
         # Pestañas para diferentes análisis
@@ -239,7 +262,7 @@ def main():
                 )
                 
                 # Botón de descarga
-                csv = df[selected_columns].to_csv()
+                csv = _csv_bytes(selected_ticker, tuple(selected_columns), df)
                 st.download_button(
                     label="📥 Descargar CSV",
                     data=csv,
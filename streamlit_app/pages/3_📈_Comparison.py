@@ -12,22 +12,29 @@ import numpy as np
 root_dir = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(root_dir))
 
-from src.data.data_fetcher import StockDataFetcher
+from src.data.data_fetcher import get_fetcher
+from src.utils.config import CACHE_CONFIG
 from src.data.data_processor import DataProcessor
-from src.visualization.charts import ChartBuilder
 
 st.set_page_config(page_title="Comparación", page_icon="📈", layout="wide")
 
-@st.cache_data(ttl=3600)
+# L1 en memoria; el fetcher guarda además la lista en disco (L2) con el mismo TTL
+@st.cache_data(ttl=CACHE_CONFIG['sp500_list_ttl'])
 def get_sp500_tickers():
     """Obtiene lista de tickers del S&P 500"""
-    fetcher = StockDataFetcher()
+    fetcher = get_fetcher()
     return fetcher.get_sp500_tickers()
 
+@st.cache_data(ttl=CACHE_CONFIG['sp500_list_ttl'])
+def get_sp500_index():
+    """Lista de tickers del S&P 500 y su mapa {ticker: posición}"""
+    tickers = get_sp500_tickers()
+    return tickers, {ticker: i for i, ticker in enumerate(tickers)}
+
 @st.cache_data(ttl=3600)
 def load_multiple_stocks(tickers, period):
     """Carga datos de múltiples acciones"""
-    fetcher = StockDataFetcher()
+    fetcher = get_fetcher()
     data = fetcher.get_multiple_stocks(tickers, period=period)
     
     # Procesar datos
@@ -44,40 +51,87 @@ def load_multiple_stocks(tickers, period):
 
 def calculate_correlation_matrix(data_dict):
     """Calcula matriz de correlación entre acciones"""
-    # Crear DataFrame con precios de cierre
-    close_prices = pd.DataFrame()
-    
-    for ticker, df in data_dict.items():
-        close_prices[ticker] = df['Close']
+    # DataFrame con precios de cierre en una sola concatenación,
+    # alineado sobre la unión de fechas
+    close_prices = pd.concat(
+        {ticker: df['Close'] for ticker, df in data_dict.items()},
+        axis=1,
+        join='outer'
+    )
     
     # Calcular correlación
     correlation = close_prices.corr()
     
     return correlation
 
+def calculate_performance_table(data_dict):
+    """Tabla de rendimiento con una reducción vectorizada por columna"""
+    tickers = list(data_dict)
+    
+    # Matrices (fechas x tickers) alineadas por fecha; cada reducción
+    # ignora los NaN de las fechas que un ticker no tiene
+    closes = pd.concat({ticker: data_dict[ticker]['Close'] for ticker in tickers}, axis=1)
+    returns = pd.concat({ticker: data_dict[ticker]['Returns'] for ticker in tickers}, axis=1)
+    
+    first_price = closes.bfill().iloc[0].astype('float64')
+    last_price = closes.ffill().iloc[-1].astype('float64')
+    change = last_price - first_price
+    change_pct = (change / first_price) * 100
+    
+    high = pd.concat({ticker: data_dict[ticker]['High'] for ticker in tickers}, axis=1).max()
+    low = pd.concat({ticker: data_dict[ticker]['Low'] for ticker in tickers}, axis=1).min()
+    
+    # Retornos en float64 (calculate_returns); una sola desviación por columna
+    volatility = returns.std() * np.sqrt(252) * 100
+    
+    return pd.DataFrame({
+        'Ticker': tickers,
+        'Precio Inicial': [f"${value:.2f}" for value in first_price],
+        'Precio Final': [f"${value:.2f}" for value in last_price],
+        'Cambio': [f"${value:.2f}" for value in change],
+        'Cambio %': [f"{value:.2f}%" for value in change_pct],
+        'Máximo': [f"${value:.2f}" for value in high],
+        'Mínimo': [f"${value:.2f}" for value in low],
+        'Volatilidad Anual': [f"{value:.2f}%" for value in volatility]
+    })
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def styled_correlation_html(correlation_matrix):
+    """Tabla HTML de correlaciones con gradiente, renderizada una vez por matriz"""
+    return (
+        correlation_matrix.style
+        .background_gradient(cmap='RdBu', vmin=-1, vmax=1)
+        .format('{:.2f}')
+        .to_html()
+    )
+
 def calculate_portfolio_stats(data_dict, weights=None):
     """Calcula estadísticas del portafolio"""
     if weights is None:
         # Pesos iguales
         weights = {ticker: 1/len(data_dict) for ticker in data_dict.keys()}
     
-    # Calcular retornos del portafolio
-    portfolio_returns = []
-    
-    for ticker, weight in weights.items():
-        if ticker in data_dict:
-            df = data_dict[ticker]
-            if 'Returns' in df.columns:
-                weighted_returns = df['Returns'] * weight
-                portfolio_returns.append(weighted_returns)
+    tickers = [
+        ticker for ticker in weights
+        if ticker in data_dict and 'Returns' in data_dict[ticker].columns
+    ]
     
-    if portfolio_returns:
-        portfolio_returns = pd.concat(portfolio_returns, axis=1).sum(axis=1)
+    if tickers:
+        # Matriz de retornos (fechas x tickers) alineada por fecha; los
+        # huecos cuentan como retorno 0, igual que al sumar columnas
+        returns_matrix = pd.concat(
+            {ticker: data_dict[ticker]['Returns'] for ticker in tickers},
+            axis=1
+        ).to_numpy(dtype=np.float64)
+        weight_vector = np.array([weights[ticker] for ticker in tickers], dtype=np.float64)
+        
+        # Retornos del portafolio en un solo producto matriz-vector
+        portfolio_returns = np.nan_to_num(returns_matrix) @ weight_vector
         
         # Estadísticas
-        total_return = (1 + portfolio_returns).prod() - 1
+        total_return = np.prod(1 + portfolio_returns) - 1
         avg_daily_return = portfolio_returns.mean()
-        volatility = portfolio_returns.std()
+        volatility = portfolio_returns.std(ddof=1) if portfolio_returns.size > 1 else np.nan
         sharpe_ratio = (avg_daily_return / volatility) * np.sqrt(252) if volatility > 0 else 0
         
         return {
@@ -98,11 +152,11 @@ def main():
         st.header("⚙️ Configuración")
         
         # Obtener tickers
-        all_tickers = get_sp500_tickers()
+        all_tickers, ticker_index = get_sp500_index()
         
         # Selección múltiple de acciones
         default_tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN']
-        default_selection = [t for t in default_tickers if t in all_tickers]
+        default_selection = [t for t in default_tickers if t in ticker_index]
         
         selected_tickers = st.multiselect(
             "Selecciona acciones (máx. 10)",
@@ -165,7 +219,7 @@ def main():
                 show_returns = st.checkbox("Mostrar retornos", value=False)
             
             # Gráfico de comparación
-            chart_builder = ChartBuilder(pd.DataFrame(), "Comparación")
+            from src.visualization.charts import ChartBuilder
             
             if show_returns:
                 # Crear DataFrame de retornos acumulados
@@ -177,40 +231,17 @@ def main():
                         )
                 
                 if returns_data:
-                    fig = chart_builder.create_comparison_chart(returns_data, normalize=False)
+                    fig = ChartBuilder.create_comparison_chart(returns_data, normalize=False)
                     st.plotly_chart(fig, use_container_width=True)
             else:
-                fig = chart_builder.create_comparison_chart(stock_data, normalize=normalize)
+                fig = ChartBuilder.create_comparison_chart(stock_data, normalize=normalize)
                 st.plotly_chart(fig, use_container_width=True)
             
             # Tabla de rendimiento
             st.markdown("---")
             st.subheader("📋 Rendimiento en el Período")
             
-            performance_data = []
-            
-            for ticker, df in stock_data.items():
-                first_price = df['Close'].iloc[0]
-                last_price = df['Close'].iloc[-1]
-                change = last_price - first_price
-                change_pct = (change / first_price) * 100
-                
-                high = df['High'].max()
-                low = df['Low'].min()
-                volatility = df['Close'].pct_change().std() * np.sqrt(252) * 100
-                
-                performance_data.append({
-                    'Ticker': ticker,
-                    'Precio Inicial': f"${first_price:.2f}",
-                    'Precio Final': f"${last_price:.2f}",
-                    'Cambio': f"${change:.2f}",
-                    'Cambio %': f"{change_pct:.2f}%",
-                    'Máximo': f"${high:.2f}",
-                    'Mínimo': f"${low:.2f}",
-                    'Volatilidad Anual': f"{volatility:.2f}%"
-                })
-            
-            df_performance = pd.DataFrame(performance_data)
+            df_performance = calculate_performance_table(stock_data)
             st.dataframe(df_performance, use_container_width=True, hide_index=True)
             
         elif analysis_type == 'Correlación':
@@ -220,8 +251,8 @@ def main():
             correlation_matrix = calculate_correlation_matrix(stock_data)
             
             # Mostrar mapa de calor
-            chart_builder = ChartBuilder(pd.DataFrame(), "Correlación")
-            fig_corr = chart_builder.create_correlation_heatmap(correlation_matrix)
+            from src.visualization.charts import ChartBuilder
+            fig_corr = ChartBuilder.create_correlation_heatmap(correlation_matrix)
             st.plotly_chart(fig_corr, use_container_width=True)
             
             # Interpretación
@@ -238,9 +269,9 @@ def main():
             # Tabla de correlación
             st.markdown("---")
             st.subheader("📊 Matriz de Correlación Detallada")
-            st.dataframe(
-                correlation_matrix.style.background_gradient(cmap='RdBu', vmin=-1, vmax=1),
-                use_container_width=True
+            st.markdown(
+                styled_correlation_html(correlation_matrix),
+                unsafe_allow_html=True
             )
             
         elif analysis_type == 'Portafolio':
@@ -331,14 +362,21 @@ def main():
             st.markdown("---")
             st.markdown("#### 📈 Evolución del Portafolio")
             
-            # Calcular valor del portafolio normalizado
+            # Calcular valor del portafolio normalizado: matriz de cierres
+            # (fechas x tickers) normalizada y ponderada en una sola operación
+            held = [
+                ticker for ticker, weight in weights.items()
+                if ticker in stock_data and weight > 0
+            ]
             portfolio_value = pd.DataFrame()
             
-            for ticker, weight in weights.items():
-                if ticker in stock_data and weight > 0:
-                    df = stock_data[ticker]
-                    normalized = (df['Close'] / df['Close'].iloc[0]) * weight
-                    portfolio_value[ticker] = normalized
+            if held:
+                closes = pd.concat(
+                    {ticker: stock_data[ticker]['Close'] for ticker in held},
+                    axis=1
+                ).ffill()
+                # Cada ticker se normaliza por su primer precio disponible
+                portfolio_value = closes.div(closes.bfill().iloc[0]).mul(pd.Series(weights)[held])
             
             if not portfolio_value.empty:
                 portfolio_value['Total'] = portfolio_value.sum(axis=1)
@@ -346,22 +384,29 @@ def main():
                 # Crear gráfico
                 import plotly.graph_objects as go
                 
+                # Períodos largos: como mucho ~1000 puntos por línea, conservando
+                # siempre el último valor
+                n_points = len(portfolio_value)
+                step = max(1, int(np.ceil(n_points / 1000)))
+                rows = np.unique(np.r_[np.arange(0, n_points, step), n_points - 1])
+                plot_data = portfolio_value.iloc[rows]
+                
                 fig = go.Figure()
                 
-                # Línea del portafolio total
-                fig.add_trace(go.Scatter(
-                    x=portfolio_value.index,
-                    y=portfolio_value['Total'],
+                # Línea del portafolio total (WebGL)
+                fig.add_trace(go.Scattergl(
+                    x=plot_data.index,
+                    y=plot_data['Total'],
                     name='Portafolio Total',
                     line=dict(color='blue', width=3)
                 ))
                 
                 # Líneas individuales
                 for ticker in weights.keys():
-                    if ticker in portfolio_value.columns and ticker != 'Total':
-                        fig.add_trace(go.Scatter(
-                            x=portfolio_value.index,
-                            y=portfolio_value[ticker],
+                    if ticker in plot_data.columns and ticker != 'Total':
+                        fig.add_trace(go.Scattergl(
+                            x=plot_data.index,
+                            y=plot_data[ticker],
                             name=ticker,
                             line=dict(width=1),
                             opacity=0.6
@@ -0,0 +1,10 @@
+"""
+Configuración común de los tests
+"""
+
+import sys
+from pathlib import Path
+
+# Añadir el directorio raíz al path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
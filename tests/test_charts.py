@@ -0,0 +1,24 @@
+"""
+Tests del cache de figuras
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.visualization.charts import _df_fingerprint
+
+
+def test_fingerprint_detects_interior_changes():
+    index = pd.date_range('2024-01-01', periods=50, freq='B')
+    df = pd.DataFrame({'Close': np.linspace(100.0, 150.0, 50), 'Volume': 1000}, index=index)
+    changed = df.copy()
+    changed.iloc[25, 0] += 1.0
+    
+    assert _df_fingerprint(df) == _df_fingerprint(df.copy())
+    assert _df_fingerprint(df) != _df_fingerprint(changed)
+
+
+def test_fingerprint_handles_empty_frames():
+    df = pd.DataFrame(columns=['Close'])
+    
+    assert _df_fingerprint(df) == _df_fingerprint(df.copy())
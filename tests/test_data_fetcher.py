@@ -0,0 +1,266 @@
+"""
+Tests de los módulos de descarga de datos
+"""
+
+import asyncio
+import threading
+
+import aiohttp
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data import data_fetcher
+from src.data.data_fetcher import fetch_charts
+from src.utils import data_fetcher as utils_fetcher
+from src.utils.data_fetcher import get_multiple_stocks_async
+
+
+def _payload(close, adjclose):
+    """Respuesta mínima de /v8/finance/chart con tres sesiones"""
+    return {
+        'chart': {
+            'result': [{
+                'meta': {'exchangeTimezoneName': 'America/New_York'},
+                'timestamp': [1704205800, 1704292200, 1704378600],
+                'indicators': {
+                    'quote': [{
+                        'open': close,
+                        'high': close,
+                        'low': close,
+                        'close': close,
+                        'volume': [100, 200, 300]
+                    }],
+                    'adjclose': [{'adjclose': adjclose}]
+                }
+            }]
+        }
+    }
+
+
+class _FakeResponse:
+    """Respuesta de aiohttp con estado y JSON fijos"""
+    
+    def __init__(self, status, payload=None):
+        self.status = status
+        self.payload = payload
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(None, (), status=self.status)
+    
+    async def json(self):
+        return self.payload
+
+
+class _FakeSession:
+    """ClientSession que devuelve respuestas preparadas por ticker"""
+    
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+    
+    def __call__(self, **kwargs):
+        return self
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    def get(self, url, params=None):
+        ticker = url.rsplit('/', 1)[-1]
+        self.calls.append(ticker)
+        return self.responses[ticker].pop(0)
+
+
+@pytest.fixture
+def fake_session(monkeypatch):
+    session = _FakeSession({
+        'AAPL': [_FakeResponse(200, _payload([10.0, 11.0, 12.0], [5.0, 5.5, 6.0]))],
+        'MSFT': [
+            _FakeResponse(429),
+            _FakeResponse(200, _payload([20.0, 21.0, 22.0], [20.0, 21.0, 22.0]))
+        ],
+        'NOPE': [_FakeResponse(404)]
+    })
+    monkeypatch.setattr(data_fetcher.aiohttp, 'ClientSession', session)
+    return session
+
+
+def test_fetch_charts_parses_adjusts_and_retries_429(fake_session):
+    charts = asyncio.run(fetch_charts(['AAPL', 'MSFT', 'NOPE'], '5d', retry_delay=0))
+    
+    assert set(charts) == {'AAPL', 'MSFT'}
+    assert fake_session.calls.count('MSFT') == 2
+    assert fake_session.calls.count('NOPE') == 1
+    
+    aapl = charts['AAPL']
+    assert list(aapl.columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+    np.testing.assert_allclose(aapl['Close'], [5.0, 5.5, 6.0])
+    np.testing.assert_allclose(aapl['Volume'], [100, 200, 300])
+    assert aapl.index.tz is not None
+
+
+def test_get_multiple_stocks_async_compacts_types(fake_session):
+    stocks = asyncio.run(get_multiple_stocks_async(['AAPL'], '5d'))
+    
+    assert stocks['AAPL']['Close'].dtype == np.float32
+    assert stocks['AAPL']['Volume'].dtype == np.int64
+
+
+def test_mem_cache_returns_copies_and_survives_concurrent_eviction(monkeypatch):
+    monkeypatch.setattr(utils_fetcher, '_mem_cache', {})
+    monkeypatch.setattr(utils_fetcher, 'MEM_CACHE_SIZE', 4)
+    monkeypatch.setattr(
+        utils_fetcher, '_get_stock_data_cached',
+        lambda ticker, period, interval: pd.DataFrame({'Close': [1.0]})
+    )
+    errors = []
+    
+    def worker(offset):
+        try:
+            for i in range(500):
+                df = utils_fetcher.get_stock_data(f'T{(offset + i) % 20}')
+                df['Close'] = 99.0
+        except Exception as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert not errors
+    assert len(utils_fetcher._mem_cache) <= 4
+    assert all(df['Close'].iloc[0] == 1.0 for _, df in utils_fetcher._mem_cache.values())
+
+
+def _batch_frame(tickers):
+    """Resultado de yf.download(group_by='ticker') con dos sesiones"""
+    index = pd.date_range('2024-01-02', periods=2, name='Date')
+    frames = {
+        ticker: pd.DataFrame({
+            'Open': [1.0, 2.0],
+            'High': [1.0, 2.0],
+            'Low': [1.0, 2.0],
+            'Close': [1.0, 2.0],
+            'Volume': [10, 20]
+        }, index=index)
+        for ticker in tickers
+    }
+    return pd.concat(frames, axis=1)
+
+
+def test_get_multiple_stocks_batches_only_disk_cache_misses(monkeypatch, tmp_path):
+    requested = []
+    
+    def fake_download(tickers, **kwargs):
+        requested.append(list(tickers))
+        return _batch_frame(tickers)
+    
+    monkeypatch.setattr(data_fetcher.yf, 'download', fake_download)
+    fetcher = data_fetcher.StockDataFetcher()
+    fetcher.cache_dir = tmp_path
+    
+    first = fetcher.get_multiple_stocks(['AAPL', 'MSFT'], period='1mo')
+    second = fetcher.get_multiple_stocks(['AAPL', 'MSFT', 'NVDA'], period='1mo')
+    
+    assert requested == [['AAPL', 'MSFT'], ['NVDA']]
+    assert list(first) == ['AAPL', 'MSFT']
+    assert list(second) == ['AAPL', 'MSFT', 'NVDA']
+    assert (tmp_path / 'NVDA_1mo_1d.parquet').exists()
+    pd.testing.assert_frame_equal(second['AAPL'], first['AAPL'], check_freq=False)
+
+
+def test_get_multiple_stocks_inside_running_loop_fetches_serially(monkeypatch, tmp_path):
+    monkeypatch.setattr(data_fetcher.yf, 'download', lambda tickers, **kwargs: pd.DataFrame())
+    fetcher = data_fetcher.StockDataFetcher()
+    fetcher.cache_dir = tmp_path
+    
+    def no_fetch_charts(*args):
+        raise AssertionError("_fetch_charts no debe crearse con un loop activo")
+    
+    monkeypatch.setattr(fetcher, '_fetch_charts', no_fetch_charts)
+    monkeypatch.setattr(
+        fetcher, 'get_stock_data',
+        lambda ticker, period, interval: _batch_frame([ticker])[ticker]
+    )
+    
+    async def main():
+        return fetcher.get_multiple_stocks(['AAPL', 'MSFT'], period='1mo')
+    
+    data = asyncio.run(main())
+    
+    assert list(data) == ['AAPL', 'MSFT']
+
+
+def test_fetcher_stock_infos_report_failures_from_calling_thread(monkeypatch, tmp_path):
+    warnings = []
+    fetcher = data_fetcher.StockDataFetcher()
+    fetcher.cache_dir = tmp_path
+    monkeypatch.setattr(
+        fetcher, '_fetch_stock_info',
+        lambda ticker: None if ticker == 'BAD' else {'sector': ticker}
+    )
+    monkeypatch.setattr(
+        data_fetcher.st, 'warning',
+        lambda message: warnings.append((threading.current_thread(), message))
+    )
+    
+    infos = fetcher.get_multiple_stock_infos(['GOOD', 'BAD', 'GOOD'])
+    
+    assert infos == {'GOOD': {'sector': 'GOOD'}, 'BAD': {}}
+    assert len(warnings) == 1
+    assert warnings[0][0] is threading.main_thread()
+    assert 'BAD' in warnings[0][1]
+
+
+def test_stock_infos_report_failures_from_calling_thread(monkeypatch):
+    warnings = []
+    monkeypatch.setattr(
+        utils_fetcher, '_fetch_stock_info',
+        lambda ticker: None if ticker == 'BAD' else {'symbol': ticker}
+    )
+    monkeypatch.setattr(
+        utils_fetcher.st, 'warning',
+        lambda message: warnings.append((threading.current_thread(), message))
+    )
+    
+    infos = utils_fetcher.get_multiple_stock_infos(['GOOD', 'BAD', 'OTHER'])
+    
+    assert infos == {'GOOD': {'symbol': 'GOOD'}, 'BAD': None, 'OTHER': {'symbol': 'OTHER'}}
+    assert len(warnings) == 1
+    assert warnings[0][0] is threading.main_thread()
+    assert 'BAD' in warnings[0][1]
+
+
+def test_get_multiple_stocks_status_settles_on_cache_hit(monkeypatch):
+    from streamlit.testing.v1 import AppTest
+    
+    monkeypatch.setattr(
+        utils_fetcher, '_download_batch',
+        lambda batch, period: {
+            ticker: pd.DataFrame({'Close': [1.0]}) for ticker in batch if ticker != 'BAD'
+        }
+    )
+    monkeypatch.setattr(utils_fetcher, 'get_stock_data', lambda ticker, period: None)
+    utils_fetcher._get_multiple_stocks_cached.clear()
+    
+    def app():
+        from src.utils.data_fetcher import get_multiple_stocks
+        get_multiple_stocks(['AAPL', 'BAD'], '1mo')
+    
+    at = AppTest.from_function(app)
+    # La segunda ejecución sale de la caché y no debe quedarse en "running"
+    for _ in range(2):
+        at.run()
+        assert [(s.label, s.state) for s in at.status] == [('⚠️ 1/2 acciones listas', 'error')]
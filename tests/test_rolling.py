@@ -0,0 +1,95 @@
+"""
+Tests de las ventanas móviles frente a pandas
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.technical_indicators import TechnicalAnalysis
+from src.data.data_processor import DataProcessor
+from src.utils.config import INDICATORS_CONFIG
+from src.utils.rolling import rolling_mean, rolling_mean_std, rolling_means
+
+
+def _series(size: int = 250, leading: int = 9, seed: int = 3) -> np.ndarray:
+    """Precios con un tramo inicial de NaN y NaN intercalados"""
+    rng = np.random.default_rng(seed)
+    x = 1_000 + rng.standard_normal(size).cumsum()
+    x[:leading] = np.nan
+    x[[40, 41, 120, 200]] = np.nan
+    return x
+
+
+CASES = {
+    'sin_nan': np.random.default_rng(4).standard_normal(120).cumsum() + 50,
+    'con_nan': _series(),
+    'solo_nan': np.full(30, np.nan),
+}
+
+
+@pytest.mark.parametrize("case", CASES)
+@pytest.mark.parametrize("window", [1, 5, 20, 50, 400])
+def test_rolling_means_match_pandas(case, window):
+    x = CASES[case]
+    expected = pd.Series(x).rolling(window).mean().to_numpy()
+    
+    np.testing.assert_allclose(rolling_mean(x, window), expected, rtol=1e-9)
+    np.testing.assert_allclose(rolling_means(x, [window, 3])[window], expected, rtol=1e-9)
+
+
+@pytest.mark.parametrize("case", CASES)
+@pytest.mark.parametrize("window", [2, 5, 20, 50, 400])
+def test_rolling_mean_std_matches_pandas(case, window):
+    x = CASES[case]
+    series = pd.Series(x).rolling(window)
+    
+    mean, std = rolling_mean_std(x, window)
+    
+    np.testing.assert_allclose(mean, series.mean().to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(std, series.std().to_numpy(), rtol=1e-6, atol=1e-9)
+
+
+def test_rolling_mean_std_window_not_above_ddof_is_nan():
+    x = CASES['sin_nan']
+    
+    _, std = rolling_mean_std(x, 1)
+    
+    np.testing.assert_array_equal(np.isnan(std), pd.Series(x).rolling(1).std().isna())
+
+
+def test_volatility_matches_pandas():
+    df = pd.DataFrame({'Returns': pd.Series(_series()).pct_change(fill_method=None)})
+    
+    result = DataProcessor.calculate_volatility(df, window=20)
+    
+    expected = df['Returns'].rolling(20).std() * np.sqrt(252)
+    np.testing.assert_allclose(result['Volatility'], expected, rtol=1e-6, atol=1e-12)
+
+
+def test_batch_rolling_columns_match_pandas():
+    closes = np.column_stack([_series(seed=seed, leading=leading)
+                              for seed, leading in [(5, 0), (6, 9), (7, 60)]])
+    volumes = np.abs(closes) * 1_000
+    frame = pd.DataFrame(closes)
+    
+    columns = TechnicalAnalysis.batch(closes, volumes)
+    
+    for period in INDICATORS_CONFIG["sma"]["periods"]:
+        np.testing.assert_allclose(
+            columns[f'SMA_{period}'], frame.rolling(period).mean().to_numpy(), rtol=1e-9
+        )
+    
+    bb = INDICATORS_CONFIG["bollinger_bands"]
+    middle = frame.rolling(bb["period"]).mean()
+    std = frame.rolling(bb["period"]).std()
+    np.testing.assert_allclose(columns['BB_Middle'], middle.to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(
+        columns['BB_Upper'], (middle + bb["std_dev"] * std).to_numpy(), rtol=1e-9
+    )
+    np.testing.assert_allclose(
+        columns['BB_Lower'], (middle - bb["std_dev"] * std).to_numpy(), rtol=1e-9
+    )
+    np.testing.assert_allclose(
+        columns['Volume_SMA_20'], pd.DataFrame(volumes).rolling(20).mean().to_numpy(), rtol=1e-9
+    )
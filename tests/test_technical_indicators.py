@@ -0,0 +1,117 @@
+"""
+Tests de los indicadores técnicos
+"""
+
+import importlib.util
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis import technical_indicators
+from src.analysis.technical_indicators import TechnicalAnalysis, _ema
+
+
+def _close_with_gaps(size: int = 300, leading: int = 7, seed: int = 0) -> np.ndarray:
+    """Serie de cierres con NaN iniciales e intercalados"""
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.standard_normal(size).cumsum()
+    close[:leading] = np.nan
+    close[rng.random(size) < 0.1] = np.nan
+    return close
+
+
+@pytest.fixture
+def fallback_module(monkeypatch):
+    """Copia del módulo cargada sin numba (ruta pura NumPy/pandas)"""
+    with monkeypatch.context() as patch:
+        patch.setitem(sys.modules, 'numba', None)
+        spec = importlib.util.find_spec('src.analysis.technical_indicators')
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    assert not module.NUMBA_AVAILABLE
+    return module
+
+
+def _frame(close: np.ndarray) -> pd.DataFrame:
+    """DataFrame OHLCV mínimo a partir de los cierres"""
+    index = pd.date_range('2020-01-01', periods=close.size, freq='B')
+    return pd.DataFrame({
+        'Open': close,
+        'High': close,
+        'Low': close,
+        'Close': close,
+        'Volume': np.full(close.size, 1_000_000)
+    }, index=index)
+
+
+def test_ema_example_with_leading_and_embedded_nan():
+    close = np.array([np.nan, np.nan, 1.0, 2.0, np.nan, 4.0])
+    expected = pd.Series(close).ewm(span=3, adjust=False).mean().to_numpy()
+    
+    np.testing.assert_allclose(_ema(close, 3), expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("span", [2, 3, 12, 26, 50])
+def test_ema_matches_pandas_with_nan(span):
+    close = _close_with_gaps()
+    expected = pd.Series(close).ewm(span=span, adjust=False).mean().to_numpy()
+    
+    np.testing.assert_allclose(_ema(close, span), expected, rtol=1e-12)
+
+
+@pytest.mark.skipif(not technical_indicators.NUMBA_AVAILABLE, reason="requiere numba")
+def test_ema_columns_match_fallback_with_nan(fallback_module):
+    df = _frame(_close_with_gaps())
+    columns = ['EMA_12', 'EMA_26', 'EMA_50', 'MACD', 'MACD_Signal', 'MACD_Hist']
+    
+    fast = TechnicalAnalysis(df)
+    fast.add_ema()
+    fast.add_macd()
+    slow = fallback_module.TechnicalAnalysis(df)
+    slow.add_ema()
+    slow.add_macd()
+    
+    pd.testing.assert_frame_equal(fast.df[columns], slow.df[columns], rtol=1e-10)
+
+
+def _staggered(starts=(0, 5, 40), size: int = 320, seed: int = 1):
+    """Cierres y volúmenes alineados por fecha con historias escalonadas"""
+    rng = np.random.default_rng(seed)
+    closes = 100 + rng.standard_normal((size, len(starts))).cumsum(axis=0)
+    volumes = rng.integers(1_000, 1_000_000, (size, len(starts))).astype(np.float64)
+    for j, start in enumerate(starts):
+        closes[:start, j] = np.nan
+        volumes[:start, j] = np.nan
+    return starts, closes, volumes
+
+
+@pytest.mark.parametrize("module_name", ["numba", "fallback"])
+def test_rsi_skips_leading_nan(module_name, fallback_module):
+    module = technical_indicators if module_name == "numba" else fallback_module
+    close = 100 + np.random.default_rng(2).standard_normal(200).cumsum()
+    padded = np.r_[np.full(5, np.nan), close]
+    
+    result = module._rsi(padded, 14)
+    
+    assert np.isnan(result[:5 + 14]).all()
+    np.testing.assert_allclose(result[5:], module._rsi(close, 14), rtol=1e-12)
+
+
+def test_batch_matches_per_ticker_on_staggered_histories():
+    starts, closes, volumes = _staggered()
+    
+    columns = TechnicalAnalysis.batch(closes, volumes)
+    
+    for j, start in enumerate(starts):
+        df = _frame(closes[start:, j])
+        df['Volume'] = volumes[start:, j]
+        expected = TechnicalAnalysis(df).add_all_indicators()
+        
+        for name, values in columns.items():
+            assert np.isnan(values[:start, j]).all(), name
+            np.testing.assert_allclose(
+                values[start:, j], expected[name].to_numpy(),
+                rtol=1e-8, atol=1e-8, err_msg=f"{name} (columna {j})"
+            )